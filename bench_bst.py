@@ -0,0 +1,121 @@
+import random
+import sys
+import time
+
+from trees import BST, Node
+
+
+# Прежняя рекурсивная реализация, оставлена как база для сравнения
+class RecursiveBST(BST):
+    def _insert(self, current, key):
+        if key < current.key:
+            if current.left is None:
+                current.left = Node(key)
+            else:
+                self._insert(current.left, key)
+        else:
+            if current.right is None:
+                current.right = Node(key)
+            else:
+                self._insert(current.right, key)
+        current.height = 1 + max(self._get_height(current.left), self._get_height(current.right))
+
+    def in_order(self):
+        result = []
+        self._in_order(self.root, result)
+        return result
+
+    def _in_order(self, node, result):
+        if node:
+            self._in_order(node.left, result)
+            result.append(node.key)
+            self._in_order(node.right, result)
+
+    def pre_order(self):
+        result = []
+        self._pre_order(self.root, result)
+        return result
+
+    def _pre_order(self, node, result):
+        if node:
+            result.append(node.key)
+            self._pre_order(node.left, result)
+            self._pre_order(node.right, result)
+
+    def post_order(self):
+        result = []
+        self._post_order(self.root, result)
+        return result
+
+    def _post_order(self, node, result):
+        if node:
+            self._post_order(node.left, result)
+            self._post_order(node.right, result)
+            result.append(node.key)
+
+
+# Цепочка из n узлов (как после вставки отсортированных ключей), собранная
+# напрямую: вставка n отсортированных ключей стоит O(n^2)
+def make_chain(tree_class, n):
+    tree = tree_class()
+    prev = None
+    for key in range(n - 1, -1, -1):
+        node = Node(key)
+        node.left = prev
+        node.height = n - key
+        prev = node
+    tree.root = prev
+    return tree
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    try:
+        func(*args)
+    except RecursionError:
+        return None
+    return time.perf_counter() - start
+
+
+def fmt(seconds):
+    if seconds is None:
+        return "RecursionError"
+    return f"{seconds:.4f} с"
+
+
+def bench_insert(keys):
+    for tree_class in (RecursiveBST, BST):
+        tree = tree_class()
+        elapsed = timed(lambda: [tree.insert(key) for key in keys])
+        print(f"  {tree_class.__name__:13} insert x{len(keys)}: {fmt(elapsed)}")
+
+
+def bench_traversals(tree_by_class):
+    for name in ("in_order", "pre_order", "post_order", "bfs"):
+        line = [f"  {name:10}"]
+        for tree_class, tree in tree_by_class.items():
+            line.append(f"{tree_class.__name__}: {fmt(timed(getattr(tree, name)))}")
+        print("  ".join(line))
+
+
+def run(n_random=100000, n_sorted=900, n_chain=10 ** 6):
+    print(f"Случайные ключи, n = {n_random}")
+    keys = [random.randint(1, n_random) for _ in range(n_random)]
+    bench_insert(keys)
+    trees = {}
+    for tree_class in (RecursiveBST, BST):
+        trees[tree_class] = tree_class()
+        for key in keys:
+            trees[tree_class].insert(key)
+    bench_traversals(trees)
+
+    # Меньше лимита рекурсии, чтобы рекурсивная версия вообще отработала
+    print(f"Отсортированные ключи, n = {n_sorted}")
+    bench_insert(list(range(n_sorted)))
+
+    print(f"Цепочка из {n_chain} узлов, лимит рекурсии {sys.getrecursionlimit()}")
+    bench_traversals({tree_class: make_chain(tree_class, n_chain) for tree_class in (RecursiveBST, BST)})
+
+
+if __name__ == "__main__":
+    run(n_chain=int(sys.argv[1]) if len(sys.argv) > 1 else 10 ** 6)
@@ -0,0 +1,44 @@
+import random
+import resource
+import sys
+import time
+from multiprocessing import Pool
+
+from trees import AVLTree, CompactAVLTree, CompactRBTree, RBTree
+
+TREE_CLASSES = {
+    "AVLTree": AVLTree,
+    "CompactAVLTree": CompactAVLTree,
+    "RBTree": RBTree,
+    "CompactRBTree": CompactRBTree,
+}
+
+
+def peak_rss_mb():
+    # ru_maxrss в Linux - килобайты
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+# Каждое измерение - в отдельном процессе, чтобы пиковый RSS не смешивался
+def measure(args):
+    name, n, seed = args
+    rng = random.Random(seed)
+    keys = [rng.randint(1, n) for _ in range(n)]
+    base_rss = peak_rss_mb()
+    tree = TREE_CLASSES[name]()
+    start = time.perf_counter()
+    for key in keys:
+        tree.insert(key)
+    elapsed = time.perf_counter() - start
+    return name, n, n / elapsed, peak_rss_mb() - base_rss, tree.height()
+
+
+def run(sizes=(10 ** 5, 10 ** 6), seed=0):
+    tasks = [(name, n, seed) for n in sizes for name in TREE_CLASSES]
+    with Pool(processes=1, maxtasksperchild=1) as pool:
+        for name, n, rate, rss, height in pool.imap(measure, tasks):
+            print(f"{name:15} n={n:<9} {rate:12,.0f} вставок/с   пиковый RSS +{rss:8.1f} МБ   высота {height}")
+
+
+if __name__ == "__main__":
+    run(tuple(int(arg) for arg in sys.argv[1:]) or (10 ** 5, 10 ** 6))
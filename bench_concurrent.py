@@ -0,0 +1,50 @@
+import random
+import sys
+import threading
+import time
+
+from trees import RCUTree
+
+
+def reader(tree, n, deadline, counts, index):
+    rng = random.Random(index)
+    done = 0
+    while time.perf_counter() < deadline:
+        for _ in range(1000):
+            tree.search(rng.randint(1, 2 * n))
+        done += 1000
+    counts[index] = done
+
+
+def writer(tree, n, deadline, counts):
+    rng = random.Random(-1)
+    done = 0
+    while time.perf_counter() < deadline:
+        tree.insert(rng.randint(1, 2 * n))
+        tree.delete(rng.randint(1, 2 * n))
+        done += 2
+    counts["writer"] = done
+
+
+def run(n=100000, duration=2.0, max_readers=8):
+    gil = sys._is_gil_enabled() if hasattr(sys, "_is_gil_enabled") else True
+    print(f"n = {n}, {duration} с на замер, GIL {'включен' if gil else 'выключен'}")
+    tree = RCUTree(random.Random(0).sample(range(1, 2 * n), n))
+    readers = 1
+    while readers <= max_readers:
+        counts = {}
+        deadline = time.perf_counter() + duration
+        threads = [threading.Thread(target=reader, args=(tree, n, deadline, counts, i)) for i in range(readers)]
+        threads.append(threading.Thread(target=writer, args=(tree, n, deadline, counts)))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        reads = sum(count for key, count in counts.items() if key != "writer")
+        print(f"  читателей {readers:2}: {reads / duration:12,.0f} чтений/с   "
+              f"писатель {counts['writer'] / duration:10,.0f} изменений/с")
+        readers *= 2
+
+
+if __name__ == "__main__":
+    run(*(float(arg) if i == 1 else int(arg) for i, arg in enumerate(sys.argv[1:])))
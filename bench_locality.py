@@ -0,0 +1,61 @@
+import sys
+import time
+
+import numpy as np
+
+from trees import BST, AVLTree, RBTree, SkipList, SplayTree, Treap
+
+STRUCTURES = {
+    "BST": BST,
+    "AVL": AVLTree,
+    "RB": RBTree,
+    "Splay": SplayTree,
+    "Treap": Treap,
+    "SkipList": SkipList,
+}
+
+# Показатели Ципфа для запросов: 0 - равномерный доступ, чем больше, тем
+# сильнее запросы сосредоточены на немногих горячих ключах
+EXPONENTS = (0.0, 0.8, 1.0, 1.2, 1.5, 2.0)
+
+
+# Запросы к n ключам: ранг r из 1..n запрашивается с вероятностью
+# ~ 1 / r^a, ранги отображаются на случайные ключи. Распределение то же, что
+# у workloads.zipfian, но веса задаются явно: здесь нужны и a <= 1, которые
+# rng.zipf не принимает
+def skewed_queries(rng, keys, count, a):
+    weights = 1.0 / np.arange(1, len(keys) + 1) ** a
+    ranks = rng.choice(len(keys), size=count, p=weights / weights.sum())
+    return np.asarray(keys)[rng.permutation(len(keys))][ranks].tolist()
+
+
+# Задержка поиска при перекошенном доступе: каждая структура строится заново
+# из одних и тех же ключей в случайном порядке и отвечает на одну и ту же
+# последовательность запросов. Splay-дерево подстраивается под запросы по
+# ходу замера, поэтому его время включает и перестройку
+def run(n=100000, queries=200000, seed=0):
+    rng = np.random.default_rng(seed)
+    keys = rng.permutation(n).tolist()
+    print(f"n = {n}, запросов: {queries}")
+    for a in EXPONENTS:
+        sequence = skewed_queries(rng, keys, queries, a)
+        hot = len(set(sequence))
+        print(f"a = {a}: различных ключей в запросах {hot} ({hot / n:.1%})")
+        timings = {}
+        for name, structure in STRUCTURES.items():
+            tree = structure()
+            for key in keys:
+                tree.insert(key)
+            search = tree.search
+            start = time.perf_counter()
+            for key in sequence:
+                search(key)
+            timings[name] = (time.perf_counter() - start) / queries
+        best = min(timings.values())
+        for name, seconds in timings.items():
+            mark = "  <- лучший" if seconds == best else ""
+            print(f"  {name:9} {seconds * 1e9:8.0f} нс/поиск   x{seconds / best:5.2f}{mark}")
+
+
+if __name__ == "__main__":
+    run(*(int(arg) for arg in sys.argv[1:]))
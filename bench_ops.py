@@ -0,0 +1,54 @@
+import random
+import sys
+import time
+
+from trees import BST, AVLTree, RBTree
+
+# Доли операций в смешанной нагрузке
+MIX = (("search", 0.70), ("insert", 0.10), ("delete", 0.10), ("range", 0.10))
+RANGE_WIDTH = 100
+
+
+def make_ops(n, count, seed):
+    rng = random.Random(seed)
+    names = [name for name, _ in MIX]
+    weights = [weight for _, weight in MIX]
+    ops = []
+    for name in rng.choices(names, weights, k=count):
+        key = rng.randint(1, 2 * n)
+        ops.append((name, key))
+    return ops
+
+
+def run_ops(tree, ops):
+    for name, key in ops:
+        if name == "search":
+            tree.search(key)
+        elif name == "insert":
+            tree.insert(key)
+        elif name == "delete":
+            tree.delete(key)
+        else:
+            for _ in tree.range(key, key + RANGE_WIDTH):
+                pass
+
+
+def run(n=100000, count=200000, seed=0):
+    rng = random.Random(seed)
+    keys = [rng.randint(1, 2 * n) for _ in range(n)]
+    ops = make_ops(n, count, seed + 1)
+    mix = ", ".join(f"{name} {weight:.0%}" for name, weight in MIX)
+    print(f"n = {n}, операций: {count} ({mix})")
+    for tree_class in (BST, AVLTree, RBTree):
+        tree = tree_class()
+        for key in keys:
+            tree.insert(key)
+        start = time.perf_counter()
+        run_ops(tree, ops)
+        elapsed = time.perf_counter() - start
+        print(f"  {tree_class.__name__:8} {count / elapsed:12,.0f} операций/с   высота {tree.height()}")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    run(*args)
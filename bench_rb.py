@@ -0,0 +1,50 @@
+import gc
+import sys
+import time
+import tracemalloc
+
+from trees import FastRBTree, RBTree, workloads
+
+
+def build(tree_class, keys):
+    tree = tree_class()
+    insert = tree.insert
+    for key in keys:
+        insert(key)
+    return tree
+
+
+# RBTree против FastRBTree: время вставки n ключей и память на узел. Форма
+# деревьев одинакова, это проверяется по обходу в ширину и высоте
+def run(n=10 ** 6, seed=0):
+    print(f"n = {n}")
+    for workload in ("uniform", "sorted"):
+        keys = workloads.generate(workload, n, seed).tolist()
+        timings = {}
+        trees = {}
+        for tree_class in (RBTree, FastRBTree):
+            gc.collect()
+            gc.disable()
+            start = time.perf_counter()
+            trees[tree_class] = build(tree_class, keys)
+            timings[tree_class] = time.perf_counter() - start
+            gc.enable()
+        slow, fast = trees[RBTree], trees[FastRBTree]
+        same = slow.height() == fast.height() and slow.bfs() == fast.bfs()
+        del slow, fast, trees
+        print(f"  {workload:8} RBTree: {timings[RBTree]:6.2f} с   FastRBTree: {timings[FastRBTree]:6.2f} с   "
+              f"ускорение x{timings[RBTree] / timings[FastRBTree]:.2f}   форма совпадает: {'да' if same else 'НЕТ'}")
+
+    # Память на узел по tracemalloc на меньшем n: трассировка замедляет вставку
+    sample = workloads.generate("uniform", min(n, 10 ** 5), seed).tolist()
+    for tree_class in (RBTree, FastRBTree):
+        tracemalloc.start()
+        tree = build(tree_class, sample)
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        print(f"  {tree_class.__name__:10} {size / len(tree):6.1f} байт на узел")
+        del tree
+
+
+if __name__ == "__main__":
+    run(*(int(arg) for arg in sys.argv[1:]))
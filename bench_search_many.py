@@ -0,0 +1,35 @@
+import sys
+import time
+
+import numpy as np
+
+from trees import AVLTree, RBTree
+
+
+def run(n=10 ** 6, probes=10 ** 5, seed=0):
+    rng = np.random.default_rng(seed)
+    keys = rng.integers(1, 2 * n, size=n).tolist()
+    queries = rng.integers(0, 2 * n + 1, size=probes)
+    print(f"n = {n}, запросов: {probes}")
+    for tree_class in (AVLTree, RBTree):
+        tree = tree_class.from_iterable(keys)
+
+        start = time.perf_counter()
+        expected = [tree.search(key) for key in queries.tolist()]
+        loop = time.perf_counter() - start
+
+        start = time.perf_counter()
+        tree.search_many(queries[:1])
+        freeze = time.perf_counter() - start
+
+        start = time.perf_counter()
+        result = tree.search_many(queries)
+        batch = time.perf_counter() - start
+
+        assert result.found.tolist() == expected
+        print(f"  {tree_class.__name__:8} цикл search: {probes / loop:12,.0f} запросов/с   "
+              f"search_many: {probes / batch:14,.0f} запросов/с (x{loop / batch:.0f}), снимок {freeze:.3f} с")
+
+
+if __name__ == "__main__":
+    run(*(int(arg) for arg in sys.argv[1:]))
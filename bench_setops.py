@@ -0,0 +1,46 @@
+import random
+import sys
+import time
+
+from trees import AVLTree, RBTree
+
+
+# Слияние индексов: объединение большого дерева с деревом из m ключей через
+# union и вставка пачки из m ключей через insert_batch против поштучной
+# вставки тех же ключей
+def run(n=200000, processes=None, seed=0):
+    rng = random.Random(seed)
+    keys = rng.sample(range(8 * n), n)
+    print(f"n = {n}")
+    m = 10
+    while m <= n:
+        extra = rng.sample(range(8 * n), m)
+        for tree_class in (AVLTree, RBTree):
+            tree = tree_class.from_iterable(keys)
+            start = time.perf_counter()
+            for key in extra:
+                tree.insert(key)
+            inserts = time.perf_counter() - start
+
+            tree = tree_class.from_iterable(keys)
+            other = tree_class.from_iterable(extra)
+            start = time.perf_counter()
+            tree.union(other, processes)
+            union = time.perf_counter() - start
+            print(f"  m = {m:7} {tree_class.__name__:8} вставками: {inserts:8.4f} с   union: {union:8.4f} с")
+
+        # Пачка в AVL-дерево: insert_batch против перестройки bulk_insert
+        tree = AVLTree.from_iterable(keys)
+        start = time.perf_counter()
+        tree.insert_batch(extra, processes)
+        batch = time.perf_counter() - start
+        tree = AVLTree.from_iterable(keys)
+        start = time.perf_counter()
+        tree.bulk_insert(extra)
+        rebuild = time.perf_counter() - start
+        print(f"  m = {m:7} AVLTree  insert_batch: {batch:8.4f} с   bulk_insert: {rebuild:8.4f} с")
+        m *= 10
+
+
+if __name__ == "__main__":
+    run(*(int(arg) for arg in sys.argv[1:]))
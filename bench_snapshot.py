@@ -0,0 +1,38 @@
+import os
+import random
+import sys
+import tempfile
+import time
+
+from trees import BST, AVLTree, RBTree
+
+
+def run(n=10 ** 6, seed=0):
+    rng = random.Random(seed)
+    keys = [rng.randint(1, n) for _ in range(n)]
+    print(f"n = {n}")
+    with tempfile.TemporaryDirectory() as directory:
+        for tree_class in (BST, AVLTree, RBTree):
+            path = os.path.join(directory, f"{tree_class.__name__}.tree")
+            tree = tree_class()
+            start = time.perf_counter()
+            for key in keys:
+                tree.insert(key)
+            build = time.perf_counter() - start
+
+            start = time.perf_counter()
+            tree.save(path)
+            save = time.perf_counter() - start
+
+            start = time.perf_counter()
+            loaded = tree_class.load(path)
+            load = time.perf_counter() - start
+
+            assert loaded.height() == tree.height()
+            size = os.path.getsize(path) / 2 ** 20
+            print(f"  {tree_class.__name__:8} вставками: {build:7.2f} с   save: {save:6.2f} с   "
+                  f"load: {load:6.2f} с   файл {size:.1f} МБ")
+
+
+if __name__ == "__main__":
+    run(*(int(arg) for arg in sys.argv[1:]))
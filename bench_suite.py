@@ -0,0 +1,264 @@
+import gc
+import json
+import platform
+import resource
+import statistics
+import sys
+import time
+import tracemalloc
+from multiprocessing import Pool
+
+from trees import BST, AVLTree, BPlusTree, RBTree, workloads
+
+# Сравнительный набор замеров: пропускная способность вставки и обходов и
+# память для каждого дерева, распределения ключей и n. Результаты пишутся в
+# JSON; режим check повторяет замеры базового файла и завершается с кодом 1,
+# если пропускная способность упала больше допуска.
+#
+# python bench_suite.py run baseline.json [max_n]       - замер и запись
+# python bench_suite.py check baseline.json [допуск] [max_n] - сравнение
+TREES = {"BST": BST, "AVL": AVLTree, "RB": RBTree, "B+": BPlusTree}
+WORKLOADS = ("uniform", "sorted", "zipfian", "duplicate_heavy")
+SIZES = tuple(10 ** power for power in range(3, 8))
+THROUGHPUT = ("inserts_per_sec", "in_order_keys_per_sec", "bfs_keys_per_sec")
+# Порог шума: на неизмененном коде (один процессор, n до 10^4) отдельная
+# метрика после поправки на скорость машины отклоняется от базы со
+# стандартным отклонением около 18%, в худшем случае до -30%, и отклонения
+# до -15..-25% иногда повторяются во всех перемерах. Поэтому допуск по
+# умолчанию 25%; на выделенной тихой машине его можно задать меньше
+TOLERANCE = 0.25
+CONFIRM_RUNS = 2
+
+# Каждый замер - медиана SAMPLES выборок; выборка повторяет операцию, пока
+# на нее не уйдет MIN_SAMPLE_SECONDS, так что даже на n = 10^3 она длится не
+# меньше десятка миллисекунд. Выборки прекращаются, когда на них ушло
+# больше SAMPLE_BUDGET секунд (на больших n остается одна выборка)
+SAMPLES = 5
+MIN_SAMPLE_SECONDS = 0.05
+SAMPLE_BUDGET = 2.0
+
+# На упорядоченных ключах и длинных сериях повторов BST вырождается в
+# цепочку и вставка стоит O(n^2), поэтому такие замеры ограничены по n. У
+# zipfian повторы - самый горячий ключ, около пятой части всех ключей
+DEGENERATE_FOR_BST = ("sorted", "reverse_sorted", "nearly_sorted", "zipfian")
+BST_DEGENERATE_LIMIT = 10 ** 3
+
+# Под tracemalloc вставка в разы медленнее, поэтому трассировка только до
+# этого n; пиковый RSS снимается всегда
+TRACEMALLOC_LIMIT = 10 ** 6
+TRAVERSAL_TREES = 3
+REFERENCE_SIZE = 10 ** 5
+
+
+def case_name(tree_name, workload, n):
+    return f"{tree_name}/{workload}/{n}"
+
+
+def cases(max_n=SIZES[-1]):
+    for n in SIZES:
+        if n > max_n:
+            continue
+        for workload in WORKLOADS:
+            for tree_name in TREES:
+                if tree_name == "BST" and workload in DEGENERATE_FOR_BST and n > BST_DEGENERATE_LIMIT:
+                    continue
+                yield tree_name, workload, n
+
+
+def peak_rss_bytes():
+    # ru_maxrss в Linux - килобайты
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+# Медиана времени одного вызова run по выборкам. Медиана устойчива к
+# единичным выбросам в обе стороны, в отличие от лучшего времени, которое
+# само шумит на величину допуска. Сборщик мусора на время замера отключен:
+# его проходы по всем узлам дерева дают разброс больше допуска
+def median_time(run, samples=SAMPLES, min_time=MIN_SAMPLE_SECONDS, budget=SAMPLE_BUDGET):
+    times = []
+    spent = 0.0
+    gc.collect()
+    gc.disable()
+    try:
+        while len(times) < samples and spent <= budget:
+            calls = 0
+            start = time.perf_counter()
+            while True:
+                run()
+                calls += 1
+                elapsed = time.perf_counter() - start
+                if elapsed >= min_time:
+                    break
+            times.append(elapsed / calls)
+            spent += elapsed
+    finally:
+        gc.enable()
+    return statistics.median(times)
+
+
+# Эталонная нагрузка на чистом Python (словари, атрибуты, вызовы): по ней
+# проверка отделяет регрессию кода от общего замедления машины
+class _Probe:
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+
+def reference_load(size=REFERENCE_SIZE):
+    table = {}
+    for i in range(size):
+        table[i & 1023] = _Probe(i)
+    return sum(probe.value for probe in table.values())
+
+
+def build(tree_class, keys):
+    tree = tree_class()
+    for key in keys:
+        tree.insert(key)
+    return tree
+
+
+# Один замер в отдельном процессе, чтобы пиковый RSS относился только к нему
+def measure_case(case):
+    tree_name, workload, n, seed = case
+    tree_class = TREES[tree_name]
+    keys = workloads.generate(workload, n, seed).tolist()
+
+    reference_seconds = median_time(reference_load)
+    base_rss = peak_rss_bytes()
+    tree = build(tree_class, keys)
+    rss = peak_rss_bytes() - base_rss
+    insert_seconds = median_time(lambda: build(tree_class, keys))
+
+    # Деревья без повторов хранят меньше n ключей: обход считается по ним.
+    # Скорость обхода зависит от того, как узлы легли в памяти, поэтому
+    # берется медиана по нескольким заново построенным деревьям
+    stored = len(tree.in_order())
+    in_order_times = []
+    bfs_times = []
+    for _ in range(TRAVERSAL_TREES):
+        in_order_times.append(median_time(tree.in_order))
+        bfs_times.append(median_time(tree.bfs))
+        tree = build(tree_class, keys)
+    in_order_seconds = statistics.median(in_order_times)
+    bfs_seconds = statistics.median(bfs_times)
+
+    traced = None
+    if n <= TRACEMALLOC_LIMIT:
+        del tree
+        tracemalloc.start()
+        tree = build(tree_class, keys)
+        traced = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return case_name(tree_name, workload, n), {
+        "inserts_per_sec": n / insert_seconds,
+        "in_order_keys_per_sec": stored / in_order_seconds,
+        "bfs_keys_per_sec": stored / bfs_seconds,
+        "stored_keys": stored,
+        "reference_ops_per_sec": REFERENCE_SIZE / reference_seconds,
+        "peak_rss_bytes": rss,
+        "tracemalloc_peak_bytes": traced,
+        "height": tree.height(),
+    }
+
+
+def run_cases(selected, seed=0):
+    tasks = [(tree_name, workload, n, seed) for tree_name, workload, n in selected]
+    results = {}
+    with Pool(processes=1, maxtasksperchild=1) as pool:
+        for name, metrics in pool.imap(measure_case, tasks):
+            results[name] = metrics
+            traced = metrics["tracemalloc_peak_bytes"]
+            traced = "-" if traced is None else f"{traced / 2 ** 20:.1f}"
+            print(f"{name:28} {metrics['inserts_per_sec']:12,.0f} вставок/с   "
+                  f"in_order {metrics['in_order_keys_per_sec']:12,.0f} ключей/с   "
+                  f"bfs {metrics['bfs_keys_per_sec']:12,.0f} ключей/с   "
+                  f"RSS +{metrics['peak_rss_bytes'] / 2 ** 20:.1f} МБ   tracemalloc {traced} МБ",
+                  flush=True)
+    return results
+
+
+def environment():
+    return {"python": platform.python_version(), "implementation": platform.python_implementation(),
+            "machine": platform.machine(), "system": platform.system()}
+
+
+def record(path, max_n=SIZES[-1]):
+    results = run_cases(cases(max_n))
+    with open(path, "w") as f:
+        json.dump({"environment": environment(), "results": results}, f, indent=2, sort_keys=True)
+
+
+# Скорость машины в прогоне - медиана эталонной нагрузки по всем случаям.
+# Эталон отдельного случая для этого не годится: в свежих процессах с
+# одним и тем же кодом он разбегается от 0.88 до 1.5 медианы, и поправка
+# по нему сама давала "регрессии" до 50%
+def machine_speed(results):
+    return statistics.median(metrics["reference_ops_per_sec"] for metrics in results.values())
+
+
+# {случай: {метрика: описание}} для метрик, упавших больше чем на tolerance
+# после поправки на speed - отношение скорости машины к скорости при съемке базы
+def regressions(baseline, results, tolerance, speed):
+    found = {}
+    for name, metrics in results.items():
+        for metric in THROUGHPUT:
+            before = baseline[name][metric]
+            change = metrics[metric] / (before * speed) - 1
+            if change < -tolerance:
+                found.setdefault(name, {})[metric] = (
+                    f"{name} {metric}: {before:,.0f} -> {metrics[metric]:,.0f} ({change:+.1%})")
+    return found
+
+
+# Сравнение с базой: замеряются только случаи из базового файла; регрессия -
+# падение любой пропускной способности больше чем на tolerance. Случаи с
+# подозрением на регрессию перемеряются CONFIRM_RUNS раз, и регрессией
+# считается только метрика, упавшая больше допуска в каждом из перемеров:
+# шум, который отдельный замер иногда выводит за допуск, не повторяется
+# в одной и той же метрике несколько раз подряд. Скорость машины берется
+# по полному прогону и для перемеров не пересчитывается
+def check(path, tolerance=TOLERANCE, max_n=SIZES[-1]):
+    with open(path) as f:
+        baseline = json.load(f)
+    if baseline["environment"] != environment():
+        print(f"внимание: база снята в другом окружении: {baseline['environment']}")
+    selected = [case for case in cases(max_n) if case_name(*case) in baseline["results"]]
+    results = run_cases(selected)
+    speed = machine_speed(results) / machine_speed({name: baseline["results"][name] for name in results})
+    print(f"Скорость машины относительно базы: x{speed:.2f}")
+
+    found = regressions(baseline["results"], results, tolerance, speed)
+    for _ in range(CONFIRM_RUNS):
+        if not found:
+            break
+        print(f"Перемер {len(found)} случаев с подозрением на регрессию")
+        suspects = [case for case in selected if case_name(*case) in found]
+        confirmed = regressions(baseline["results"], run_cases(suspects), tolerance, speed)
+        found = {name: {metric: line for metric, line in confirmed[name].items() if metric in metrics}
+                 for name, metrics in found.items() if name in confirmed}
+        found = {name: metrics for name, metrics in found.items() if metrics}
+
+    if found:
+        print(f"Регрессии больше {tolerance:.0%}:")
+        for metrics in found.values():
+            for line in metrics.values():
+                print(f"  {line}")
+        return False
+    print(f"Регрессий больше {tolerance:.0%} нет ({len(results)} замеров)")
+    return True
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2 and sys.argv[1] == "run":
+        record(sys.argv[2], *(int(arg) for arg in sys.argv[3:4]))
+    elif len(sys.argv) > 2 and sys.argv[1] == "check":
+        tolerance = float(sys.argv[3]) if len(sys.argv) > 3 else TOLERANCE
+        max_n = int(sys.argv[4]) if len(sys.argv) > 4 else SIZES[-1]
+        sys.exit(0 if check(sys.argv[2], tolerance, max_n) else 1)
+    else:
+        print("python bench_suite.py run baseline.json [max_n]")
+        print("python bench_suite.py check baseline.json [допуск] [max_n]")
+        sys.exit(2)
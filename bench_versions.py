@@ -0,0 +1,68 @@
+import copy
+import gc
+import random
+import sys
+import time
+import tracemalloc
+
+from trees import AVLTree, PersistentAVLTree, PersistentRBTree, RBTree, VersionHistory
+
+
+# Снимок - полная копия изменяемого дерева после каждой вставки
+def copy_on_snapshot(tree_class, keys, updates):
+    tree = tree_class.from_iterable(keys)
+    versions = []
+    for key in updates:
+        tree.insert(key)
+        versions.append(copy.deepcopy(tree))
+    return versions
+
+
+# Снимок - сама новая версия персистентного дерева
+def persistent(tree_class, keys, updates):
+    history = VersionHistory(tree_class.from_iterable(keys))
+    for key in updates:
+        history.insert(key)
+    return history
+
+
+# Память меряется под tracemalloc, время - отдельным прогоном без
+# трассировки и сборщика мусора; объем исходного дерева вычитается,
+# остается цена версий
+def measure(build, tree_class, keys, updates):
+    tracemalloc.start()
+    base = tree_class.from_iterable(keys)
+    base_memory = tracemalloc.get_traced_memory()[0]
+    del base
+    versions = build(tree_class, keys, updates)
+    memory = tracemalloc.get_traced_memory()[0] - base_memory
+    tracemalloc.stop()
+    del versions
+
+    gc.collect()
+    gc.disable()
+    start = time.perf_counter()
+    build(tree_class, keys, updates)
+    elapsed = time.perf_counter() - start
+    gc.enable()
+    return elapsed, memory
+
+
+def run(n=10000, versions=50, seed=0):
+    rng = random.Random(seed)
+    keys = rng.sample(range(4 * n), n)
+    updates = [rng.randrange(4 * n) + 0.5 for _ in range(versions)]
+    print(f"n = {n}, версий: {versions}")
+    for name, build, tree_class in (
+        ("AVL, копия на снимок", copy_on_snapshot, AVLTree),
+        ("AVL, персистентное", persistent, PersistentAVLTree),
+        ("RB, копия на снимок", copy_on_snapshot, RBTree),
+        ("RB, персистентное", persistent, PersistentRBTree),
+    ):
+        elapsed, memory = measure(build, tree_class, keys, updates)
+        print(f"  {name:22} {elapsed:8.3f} с   {memory / 2 ** 20:9.2f} МБ   "
+              f"{memory / versions / 2 ** 10:8.1f} КБ на версию")
+
+
+if __name__ == "__main__":
+    run(*(int(arg) for arg in sys.argv[1:]))
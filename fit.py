@@ -0,0 +1,151 @@
+import math
+from statistics import NormalDist
+
+# Потоковая регрессия y = a * f(x) + b для f из MODELS. Модель линейна по
+# f(x), поэтому МНК решается в замкнутом виде по пяти накопленным суммам
+# (средние и центрированные суммы квадратов по Уэлфорду): обновление O(1),
+# память O(1), и накопители с разных процессов складываются через merge.
+MODELS = {
+    "log": (math.log, "ln(x)"),
+    "log2": (math.log2, "log2(x)"),
+    "sqrt": (math.sqrt, "sqrt(x)"),
+    "linear": (float, "x"),
+}
+
+
+class StreamingFit:
+    def __init__(self, model="log"):
+        if model not in MODELS:
+            raise ValueError(f"unknown model {model!r}, expected one of {', '.join(MODELS)}")
+        self.model = model
+        self._transform = MODELS[model][0]
+        self.n = 0
+        self._mean_u = 0.0
+        self._mean_y = 0.0
+        self._suu = 0.0
+        self._syy = 0.0
+        self._suy = 0.0
+
+    # Функция модели не сериализуется, ее восстанавливает имя модели
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_transform"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._transform = MODELS[self.model][0]
+
+    def update(self, x, y):
+        u = self._transform(x)
+        self.n += 1
+        du = u - self._mean_u
+        dy = y - self._mean_y
+        self._mean_u += du / self.n
+        self._mean_y += dy / self.n
+        self._suu += du * (u - self._mean_u)
+        self._syy += dy * (y - self._mean_y)
+        self._suy += du * (y - self._mean_y)
+
+    def update_many(self, xs, ys):
+        for x, y in zip(xs, ys):
+            self.update(x, y)
+
+    # Объединение с накопителем той же модели (формулы Чана)
+    def merge(self, other):
+        if other.model != self.model:
+            raise ValueError(f"cannot merge {other.model!r} fit into {self.model!r} fit")
+        if not other.n:
+            return
+        n = self.n + other.n
+        du = other._mean_u - self._mean_u
+        dy = other._mean_y - self._mean_y
+        weight = self.n * other.n / n
+        self._mean_u += du * other.n / n
+        self._mean_y += dy * other.n / n
+        self._suu += other._suu + du * du * weight
+        self._syy += other._syy + dy * dy * weight
+        self._suy += other._suy + du * dy * weight
+        self.n = n
+
+    # Коэффициенты (a, b)
+    def params(self):
+        if self.n < 2 or self._suu == 0:
+            raise ValueError("need at least two distinct x values to fit")
+        a = self._suy / self._suu
+        return a, self._mean_y - a * self._mean_u
+
+    def predict(self, x):
+        a, b = self.params()
+        return a * self._transform(x) + b
+
+    # Коэффициент детерминации; при постоянном y модель объясняет все
+    def r_squared(self):
+        self.params()
+        if self._syy == 0:
+            return 1.0
+        return self._suy * self._suy / (self._suu * self._syy)
+
+    # Доверительные интервалы ((a_lo, a_hi), (b_lo, b_hi)) по t-распределению
+    # с n - 2 степенями свободы. Это интервалы МНК в предположении независимых
+    # остатков; высоты после соседних вставок - неубывающая ступенчатая
+    # функция с сильно зависимыми остатками, и для них такие интервалы
+    # получаются во много раз уже настоящих. Для высот деревьев интервалы
+    # считаются по независимым прогонам - seed_intervals
+    def confidence_intervals(self, level=0.95):
+        a, b = self.params()
+        if self.n < 3:
+            raise ValueError("need at least three samples for confidence intervals")
+        sse = max(self._syy - a * self._suy, 0.0)
+        variance = sse / (self.n - 2)
+        a_error = math.sqrt(variance / self._suu)
+        b_error = math.sqrt(variance * (1 / self.n + self._mean_u ** 2 / self._suu))
+        t = _t_quantile((1 + level) / 2, self.n - 2)
+        return (a - t * a_error, a + t * a_error), (b - t * b_error, b + t * b_error)
+
+    def equation(self):
+        a, b = self.params()
+        sign = "-" if b < 0 else "+"
+        return f"h(n) = {a:.4f} * {MODELS[self.model][1]} {sign} {abs(b):.4f}"
+
+
+# Квантиль t-распределения без SciPy: точные формулы для 1 и 2 степеней
+# свободы, иначе разложение Корниша-Фишера от нормального квантиля
+# (относительная погрешность около 0.1% при 3 степенях свободы и быстро
+# убывает с их ростом)
+def _t_quantile(p, df):
+    if df == 1:
+        return math.tan(math.pi * (p - 0.5))
+    if df == 2:
+        return (2 * p - 1) / math.sqrt(2 * p * (1 - p))
+    z = NormalDist().inv_cdf(p)
+    z2 = z * z
+    return (z
+            + z * (z2 + 1) / (4 * df)
+            + z * ((5 * z2 + 16) * z2 + 3) / (96 * df ** 2)
+            + z * (((3 * z2 + 19) * z2 + 17) * z2 - 15) / (384 * df ** 3)
+            + z * ((((79 * z2 + 776) * z2 + 1482) * z2 - 1920) * z2 - 945) / (92160 * df ** 4))
+
+
+# Доверительные интервалы ((a_lo, a_hi), (b_lo, b_hi)) по независимым
+# прогонам одной модели (например, с разными seed): каждый прогон дает свою
+# оценку (a, b), интервал строится вокруг их среднего по t-распределению с
+# k - 1 степенями свободы. Зависимость замеров внутри прогона здесь не
+# важна - независимы только сами прогоны
+def seed_intervals(fits, level=0.95):
+    estimates = [model_fit.params() for model_fit in fits]
+    k = len(estimates)
+    if k < 2:
+        raise ValueError("need at least two independent runs for confidence intervals")
+    t = _t_quantile((1 + level) / 2, k - 1)
+    intervals = []
+    for values in zip(*estimates):
+        mean = sum(values) / k
+        error = math.sqrt(sum((value - mean) ** 2 for value in values) / ((k - 1) * k))
+        intervals.append((mean - t * error, mean + t * error))
+    return tuple(intervals)
+
+
+# Накопители всех моделей для одного ряда
+def fit_all():
+    return {model: StreamingFit(model) for model in MODELS}
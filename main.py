@@ -1,319 +1,186 @@
-import random
-import matplotlib.pyplot as plt
+import os
+import sys
+import time
 import numpy as np
-from scipy.optimize import curve_fit
 
-# Узел бинарного дерева поиска
-class Node:
-    def __init__(self, key):
-        self.key = key
-        self.left = None
-        self.right = None
-
-class BST:
-    def __init__(self):
-        self.root = None
-
-    def insert(self, key):
-        if not self.root:
-            self.root = Node(key)
-        else:
-            self._insert(self.root, key)
-
-    def _insert(self, current, key):
-        if key < current.key:
-            if current.left is None:
-                current.left = Node(key)
-            else:
-                self._insert(current.left, key)
-        else:
-            if current.right is None:
-                current.right = Node(key)
-            else:
-                self._insert(current.right, key)
-
-    def height(self):
-        return self._height(self.root)
-
-    def _height(self, current):
-        if current is None:
-            return 0
-        return 1 + max(self._height(current.left), self._height(current.right))
-
-# Узел AVL-дерева
-class AVLNode:
-    def __init__(self, key):
-        self.key = key
-        self.left = None
-        self.right = None
-        self.height = 1
-
-class AVLTree:
-    def __init__(self):
-        self.root = None
-
-    def insert(self, key):
-        self.root = self._insert(self.root, key)
-
-    def _insert(self, current, key):
-        if not current:
-            return AVLNode(key)
-        if key < current.key:
-            current.left = self._insert(current.left, key)
-        elif key > current.key:
-            current.right = self._insert(current.right, key)
-        else:
-            return current
-
-        current.height = 1 + max(self._get_height(current.left), self._get_height(current.right))
-        balance = self._get_balance(current)
-
-        if balance > 1 and key < current.left.key:
-            return self._rotate_right(current)
-        if balance < -1 and key > current.right.key:
-            return self._rotate_left(current)
-        if balance > 1 and key > current.left.key:
-            current.left = self._rotate_left(current.left)
-            return self._rotate_right(current)
-        if balance < -1 and key < current.right.key:
-            current.right = self._rotate_right(current.right)
-            return self._rotate_left(current)
-
-        return current
-
-    def _rotate_left(self, z):
-        y = z.right
-        T2 = y.left
-        y.left = z
-        z.right = T2
-        z.height = 1 + max(self._get_height(z.left), self._get_height(z.right))
-        y.height = 1 + max(self._get_height(y.left), self._get_height(y.right))
-        return y
-
-    def _rotate_right(self, z):
-        y = z.left
-        T3 = y.right
-        y.right = z
-        z.left = T3
-        z.height = 1 + max(self._get_height(z.left), self._get_height(z.right))
-        y.height = 1 + max(self._get_height(y.left), self._get_height(y.right))
-        return y
-
-    def _get_height(self, current):
-        if not current:
-            return 0
-        return current.height
-
-    def _get_balance(self, current):
-        if not current:
-            return 0
-        return self._get_height(current.left) - self._get_height(current.right)
-
-    def height(self):
-        return self._get_height(self.root)
-
-# Узел красно-черного дерева
-class RBNode:
-    def __init__(self, key, color="RED"):
-        self.key = key
-        self.left = None
-        self.right = None
-        self.parent = None
-        self.color = color
-
-class RBTree:
-    def __init__(self):
-        self.NIL = RBNode(key=None, color="BLACK")
-        self.root = self.NIL
-
-    def insert(self, key):
-        new_node = RBNode(key)
-        new_node.left = self.NIL
-        new_node.right = self.NIL
-        self._insert(new_node)
-
-    def _insert(self, z):
-        y = None
-        x = self.root
-        while x != self.NIL:
-            y = x
-            if z.key < x.key:
-                x = x.left
-            else:
-                x = x.right
-
-        z.parent = y
-        if y is None:
-            self.root = z
-        elif z.key < y.key:
-            y.left = z
-        else:
-            y.right = z
-
-        z.color = "RED"
-        self._fix_insert(z)
-
-    def _fix_insert(self, z):
-        while z != self.root and z.parent.color == "RED":
-            if z.parent == z.parent.parent.left:
-                y = z.parent.parent.right
-                if y.color == "RED":
-                    z.parent.color = "BLACK"
-                    y.color = "BLACK"
-                    z.parent.parent.color = "RED"
-                    z = z.parent.parent
-                else:
-                    if z == z.parent.right:
-                        z = z.parent
-                        self._rotate_left(z)
-                    z.parent.color = "BLACK"
-                    z.parent.parent.color = "RED"
-                    self._rotate_right(z.parent.parent)
-            else:
-                y = z.parent.parent.left
-                if y.color == "RED":
-                    z.parent.color = "BLACK"
-                    y.color = "BLACK"
-                    z.parent.parent.color = "RED"
-                    z = z.parent.parent
-                else:
-                    if z == z.parent.left:
-                        z = z.parent
-                        self._rotate_right(z)
-                    z.parent.color = "BLACK"
-                    z.parent.parent.color = "RED"
-                    self._rotate_left(z.parent.parent)
-        self.root.color = "BLACK"
-
-    def _rotate_left(self, x):
-        y = x.right
-        x.right = y.left
-        if y.left != self.NIL:
-            y.left.parent = x
-        y.parent = x.parent
-        if x.parent is None:
-            self.root = y
-        elif x == x.parent.left:
-            x.parent.left = y
-        else:
-            x.parent.right = y
-        y.left = x
-        x.parent = y
-
-    def _rotate_right(self, x):
-        y = x.left
-        x.left = y.right
-        if y.right != self.NIL:
-            y.right.parent = x
-        y.parent = x.parent
-        if x.parent is None:
-            self.root = y
-        elif x == x.parent.right:
-            x.parent.right = y
-        else:
-            x.parent.left = y
-        y.right = x
-        x.parent = y
-
-    def height(self):
-        def _height(node):
-            if node == self.NIL:
-                return 0
-            left_height = _height(node.left)
-            right_height = _height(node.right)
-            return max(left_height, right_height) + 1
-
-        return _height(self.root)
-
-# Построение графиков
-def build_and_plot():
-    bst = BST()
-    avl = AVLTree()
-    rb = RBTree()
-
-    keys = [random.randint(1, 100000) for _ in range(100000)]  # увеличиваем до 100000
-    bst_heights = []
-    avl_heights = []
-    rb_heights = []
-    x_vals = range(1000, 100001, 1000)
-
-    for i, key in enumerate(keys):
-        bst.insert(key)
-        avl.insert(key)
-        rb.insert(key)
-
-        if (i + 1) % 1000 == 0:
-            bst_heights.append(bst.height())
-            avl_heights.append(avl.height())
-            rb_heights.append(rb.height())
-
-    # Функция для логарифмической регрессии
-    def log_func(x, a, b):
-        return a * np.log(x) + b
-
-    # Регрессия для BST
-    bst_params, _ = curve_fit(log_func, x_vals, bst_heights)
-    bst_equation = f"h(n) = {bst_params[0]:.4f} * ln(x) + {bst_params[1]:.4f}"
-    print(f"BST логарифмическая регрессия: {bst_equation}")
-
-    # Регрессия для AVL
-    avl_params, _ = curve_fit(log_func, x_vals, avl_heights)
-    avl_equation = f"h(n) = {avl_params[0]:.4f} * ln(x) + {avl_params[1]:.4f}"
-    print(f"AVL логарифмическая регрессия: {avl_equation}")
-
-    # Регрессия для RB
-    rb_params, _ = curve_fit(log_func, x_vals, rb_heights)
-    rb_equation = f"h(n) = {rb_params[0]:.4f} * ln(x) + {rb_params[1]:.4f}"
-    print(f"RB-Tree логарифмическая регрессия: {rb_equation}")
-
-    # Построение графиков
-    plt.figure(figsize=(10, 6))
-    plt.plot(x_vals, bst_heights, label="BST", marker='o')
-    plt.plot(x_vals, log_func(np.array(x_vals), *bst_params), linestyle='--', color='b', label=f"Регрессия BST: {bst_equation}")
-    plt.xlabel('Количество элементов')
-    plt.ylabel('Высота дерева')
-    plt.title('Высота BST в зависимости от количества элементов')
-    plt.legend()
-    plt.grid(True)
-    plt.xlim(0, 100000)
-    plt.show()
-
-    plt.figure(figsize=(10, 6))
-    plt.plot(x_vals, avl_heights, label="AVL", marker='x')
-    plt.plot(x_vals, log_func(np.array(x_vals), *avl_params), linestyle='--', color='r', label=f"Регрессия AVL: {avl_equation}")
-    plt.xlabel('Количество элементов')
-    plt.ylabel('Высота дерева')
-    plt.title('Высота AVL в зависимости от количества элементов')
-    plt.legend()
-    plt.grid(True)
-    plt.xlim(0, 100000)
-    plt.show()
-
-    plt.figure(figsize=(10, 6))
-    plt.plot(x_vals, rb_heights, label="Красно-черное дерево", marker='^')
-    plt.plot(x_vals, log_func(np.array(x_vals), *rb_params), linestyle='--', color='g', label=f"Регрессия RB: {rb_equation}")
-    plt.xlabel('Количество элементов')
-    plt.ylabel('Высота дерева')
-    plt.title('Высота красно-черного дерева в зависимости от количества элементов')
-    plt.legend()
-    plt.grid(True)
-    plt.xlim(0, 100000)
-    plt.show()
+from fit import MODELS, fit_all
+from trees import BST, AVLTree, BPlusTree, RBTree, instrumented, workloads
+
+# Функция для логарифмической регрессии
+def log_func(x, a, b):
+    return a * np.log(x) + b
+
+# (ключ в файле результатов, подпись, краткое имя, маркер, цвет регрессии, заголовок)
+TREES = (
+    ("bst", "BST", "BST", 'o', 'b', 'Высота BST в зависимости от количества элементов'),
+    ("avl", "AVL", "AVL", 'x', 'r', 'Высота AVL в зависимости от количества элементов'),
+    ("rb", "Красно-черное дерево", "RB", '^', 'g', 'Высота красно-черного дерева в зависимости от количества элементов'),
+    ("bplus", "B+-дерево", "B+", 's', 'm', 'Высота B+-дерева в зависимости от количества элементов'),
+)
+
+# Счетчики инструментирования, снимаемые вместе с высотой
+COUNTERS = ("rotations", "recolors", "comparisons")
+
+# Измерение: высоты деревьев через каждые step вставок, время вставки и
+# регрессии высоты по всем моделям из fit.MODELS. Регрессия потоковая и
+# получает высоту после каждой вставки, а не только сохраненные точки;
+# время вставки считается без нее. workload - имя распределения ключей из workloads.py.
+# При instrument=True дополнительно сохраняются накопленные счетчики поворотов,
+# перекрасок и сравнений и гистограмма задержек вставки. BST, AVL и RB
+# работают в режиме multiset: повтор ключа - счетчик в узле, а не новый узел,
+# так что высоты сравниваются на одном и том же наборе различных ключей
+def measure(n=100000, step=1000, workload="uniform", seed=None, instrument=False):
+    tree_classes = {"bst": BST, "avl": AVLTree, "rb": RBTree, "bplus": BPlusTree}
+    if instrument:
+        tree_classes = {name: instrumented(tree_class) for name, tree_class in tree_classes.items()}
+    keys = workloads.generate(workload, n, seed).tolist()
+
+    results = {"x_vals": np.arange(step, n + 1, step), "workload": np.array(workload),
+               "fit_models": np.array(list(MODELS))}
+    for name, tree_class in tree_classes.items():
+        tree = tree_class() if name == "bplus" else tree_class(multiset=True)
+        heights = []
+        counters = {counter: [] for counter in COUNTERS}
+        fits = list(fit_all().values())
+        elapsed = 0.0
+        for i, key in enumerate(keys, 1):
+            start = time.perf_counter()
+            tree.insert(key)
+            elapsed += time.perf_counter() - start
+            height = tree.height()
+            for model_fit in fits:
+                model_fit.update(i, height)
+            if i % step == 0:
+                heights.append(height)
+                if instrument:
+                    for counter in COUNTERS:
+                        counters[counter].append(getattr(tree.stats, counter))
+        results[f"{name}_seconds"] = np.float64(elapsed)
+        if instrument:
+            for counter in COUNTERS:
+                results[f"{name}_{counter}"] = np.array(counters[counter], dtype=np.int64)
+            bounds, counts = tree.stats.latency.buckets()
+            results[f"{name}_latency_ns"] = np.array(bounds, dtype=np.int64)
+            results[f"{name}_latency_counts"] = np.array(counts, dtype=np.int64)
+            print(f"{name}: {tree.stats.summary()}")
+        results[f"{name}_heights"] = np.array(heights, dtype=np.int32)
+        # Строка на модель: a, b, R^2 и 95% доверительные интервалы a и b
+        rows = []
+        for model_fit in fits:
+            (a_lo, a_hi), (b_lo, b_hi) = model_fit.confidence_intervals()
+            rows.append([*model_fit.params(), model_fit.r_squared(), a_lo, a_hi, b_lo, b_hi])
+        results[f"{name}_fit"] = np.array(rows)
+        results[f"{name}_params"] = results[f"{name}_fit"][0, :2]
+    return results
+
+# Результаты хранятся в сжатом .npz, чтобы перестраивать графики и
+# пересчитывать регрессию без повторного измерения
+def save_results(path, results):
+    np.savez_compressed(path, **results)
+
+def load_results(path):
+    with np.load(path) as data:
+        return dict(data)
+
+def equation(params):
+    return f"h(n) = {params[0]:.4f} * ln(x) + {params[1]:.4f}"
+
+# Для результатов, записанных до потоковой регрессии, есть только params.
+# Интервалы здесь - МНК по одному прогону в предположении независимых
+# остатков, а высоты после соседних вставок зависимы, поэтому интервалы
+# занижены; интервалы по независимым seed печатает runner.py
+def print_equations(results):
+    if any(f"{name}_fit" in results for name, _, _, _, _, _ in TREES):
+        print("95% интервалы - МНК по одному прогону, в предположении независимых остатков "
+              "(высоты соседних вставок зависимы, интервалы занижены; по seed - python runner.py)")
+    for name, _, short, _, _, _ in TREES:
+        print(f"{short} логарифмическая регрессия: {equation(results[f'{name}_params'])}"
+              f" (вставка: {results[f'{name}_seconds']:.2f} с)")
+        if f"{name}_fit" not in results:
+            continue
+        for model, row in zip(results["fit_models"], results[f"{name}_fit"]):
+            a, b, r2, a_lo, a_hi, b_lo, b_hi = row
+            print(f"    {str(model):6} a = {a:.4g} [{a_lo:.4g}, {a_hi:.4g}]   "
+                  f"b = {b:.4g} [{b_lo:.4g}, {b_hi:.4g}]   R^2 = {r2:.4f}")
+
+# Отрисовка в PNG без дисплея: pyplot загружается только здесь и с бэкендом Agg
+def render(results, out_dir="."):
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    x_vals = results["x_vals"]
+    x_max = int(x_vals[-1])
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+
+    def finish(title, filename):
+        plt.xlabel('Количество элементов')
+        plt.ylabel('Высота дерева')
+        plt.title(title)
+        plt.legend()
+        plt.grid(True)
+        plt.xlim(0, x_max)
+        path = os.path.join(out_dir, filename)
+        plt.savefig(path)
+        plt.close()
+        paths.append(path)
+
+    for name, label, short, marker, color, title in TREES:
+        params = results[f"{name}_params"]
+        plt.figure(figsize=(10, 6))
+        plt.plot(x_vals, results[f"{name}_heights"], label=label, marker=marker)
+        plt.plot(x_vals, log_func(x_vals, *params), linestyle='--', color=color, label=f"Регрессия {short}: {equation(params)}")
+        finish(title, f"{name}_height.png")
 
     # Совместный график
     plt.figure(figsize=(10, 6))
-    plt.plot(x_vals, bst_heights, label="BST", marker='o')
-    plt.plot(x_vals, avl_heights, label="AVL", marker='x')
-    plt.plot(x_vals, rb_heights, label="Красно-черное дерево", marker='^')
-    plt.plot(x_vals, log_func(np.array(x_vals), *bst_params), linestyle='--', color='b', label=f"Регрессия BST: {bst_equation}")
-    plt.plot(x_vals, log_func(np.array(x_vals), *avl_params), linestyle='--', color='r', label=f"Регрессия AVL: {avl_equation}")
-    plt.plot(x_vals, log_func(np.array(x_vals), *rb_params), linestyle='--', color='g', label=f"Регрессия RB: {rb_equation}")
-    plt.xlabel('Количество элементов')
-    plt.ylabel('Высота дерева')
-    plt.title('Сравнение высоты деревьев поиска (BST, AVL, RB) в зависимости от количества элементов')
-    plt.legend()
-    plt.grid(True)
-    plt.xlim(0, 100000)
-    plt.show()
+    for name, label, _, marker, _, _ in TREES:
+        plt.plot(x_vals, results[f"{name}_heights"], label=label, marker=marker)
+    for name, _, short, _, color, _ in TREES:
+        params = results[f"{name}_params"]
+        plt.plot(x_vals, log_func(x_vals, *params), linestyle='--', color=color, label=f"Регрессия {short}: {equation(params)}")
+    finish('Сравнение высоты деревьев поиска (BST, AVL, RB, B+) в зависимости от количества элементов', "comparison_height.png")
+
+    # Работа на одну вставку по интервалам между замерами (если измерение инструментировано)
+    if "bst_comparisons" in results:
+        step = int(x_vals[0])
+        plt.figure(figsize=(10, 6))
+        for name, label, _, marker, _, _ in TREES:
+            comparisons = np.diff(results[f"{name}_comparisons"], prepend=0) / step
+            rebalancing = np.diff(results[f"{name}_rotations"] + results[f"{name}_recolors"], prepend=0) / step
+            plt.plot(x_vals, comparisons, label=f"{label}: сравнения", marker=marker)
+            plt.plot(x_vals, rebalancing, label=f"{label}: повороты и перекраски", marker=marker, linestyle=':')
+        plt.xlabel('Количество элементов')
+        plt.ylabel('Операций на вставку')
+        plt.title('Работа на одну вставку')
+        plt.legend()
+        plt.grid(True)
+        plt.xlim(0, x_max)
+        path = os.path.join(out_dir, "work_per_insert.png")
+        plt.savefig(path)
+        plt.close()
+        paths.append(path)
+    return paths
 
-build_and_plot()
+# Построение графиков
+def build_and_plot(results_path="heights.npz", out_dir="."):
+    results = measure()
+    save_results(results_path, results)
+    print_equations(results)
+    return render(results, out_dir)
+
+# python main.py                      - измерение и графики
+# python main.py measure heights.npz [workload] [instrument] - только измерение
+# python main.py render heights.npz [каталог] - только графики из файла
+if __name__ == "__main__":
+    if len(sys.argv) > 2 and sys.argv[1] == "measure":
+        results = measure(workload=sys.argv[3] if len(sys.argv) > 3 else "uniform",
+                          instrument=sys.argv[4:5] == ["instrument"])
+        save_results(sys.argv[2], results)
+        print_equations(results)
+    elif len(sys.argv) > 2 and sys.argv[1] == "render":
+        for path in render(load_results(sys.argv[2]), *sys.argv[3:4]):
+            print(path)
+    else:
+        build_and_plot()
@@ -0,0 +1,104 @@
+import os
+import sys
+import time
+from multiprocessing import Pool
+
+import numpy as np
+
+from fit import MODELS, fit_all, seed_intervals
+from trees import BST, AVLTree, BPlusTree, RBTree, workloads
+
+TREES = {"BST": BST, "AVL": AVLTree, "RB": RBTree, "B+": BPlusTree}
+
+
+# Один прогон: дерево заполняется n ключами из workload, высота снимается
+# каждые step вставок, а регрессия обновляется после каждой вставки; повторы
+# ключей в BST, AVL и RB, как в main.measure, учитываются счетчиком в узле
+def measure_heights(task):
+    tree_name, seed, n, step, workload = task
+    tree = TREES[tree_name]() if tree_name == "B+" else TREES[tree_name](multiset=True)
+    heights = []
+    fits = fit_all()
+    for i, key in enumerate(workloads.generate(workload, n, seed).tolist(), 1):
+        tree.insert(key)
+        height = tree.height()
+        for model_fit in fits.values():
+            model_fit.update(i, height)
+        if i % step == 0:
+            heights.append(height)
+    return tree_name, seed, heights, fits
+
+
+# Каждая комбинация (дерево, seed, n) - отдельная задача пула; результаты
+# забираются по мере готовности, а не после завершения всех задач. Кроме
+# средних кривых возвращаются регрессии по всем вставкам всех прогонов
+# (накопители из процессов складываются без передачи самих высот) и
+# регрессии каждого прогона по отдельности - для интервалов по seed
+def run_sweep(tree_names=tuple(TREES), seeds=range(8), n=100000, step=1000, workload="uniform", processes=None):
+    tasks = [(tree_name, seed, n, step, workload) for tree_name in tree_names for seed in seeds]
+    samples = {tree_name: [] for tree_name in tree_names}
+    fits = {tree_name: fit_all() for tree_name in tree_names}
+    seed_fits = {tree_name: {model: [] for model in MODELS} for tree_name in tree_names}
+    with Pool(processes=processes or os.cpu_count()) as pool:
+        for done, (tree_name, seed, heights, run_fits) in enumerate(pool.imap_unordered(measure_heights, tasks), 1):
+            samples[tree_name].append(heights)
+            for model, model_fit in run_fits.items():
+                seed_fits[tree_name][model].append(model_fit)
+                fits[tree_name][model].merge(model_fit)
+            print(f"[{done}/{len(tasks)}] {tree_name} seed={seed}", file=sys.stderr)
+
+    x_vals = np.arange(step, n + 1, step)
+    curves = {}
+    for tree_name, runs in samples.items():
+        runs = np.array(runs, dtype=float)
+        curves[tree_name] = (x_vals, runs.mean(axis=0), runs.std(axis=0))
+    return curves, fits, seed_fits
+
+
+# Средние кривые с разбросом и регрессии в .npz рядом с результатами main:
+# {дерево}_mean и {дерево}_std по x_vals, {дерево}_fit - строки
+# [a, b, R^2, a_lo, a_hi, b_lo, b_hi] в порядке fit_models (интервалы по
+# seed, NaN при одном seed)
+def save_sweep(path, curves, fits, seed_fits, workload="uniform"):
+    results = {"workload": np.array(workload), "fit_models": np.array(list(MODELS))}
+    for tree_name, (x_vals, mean, std) in curves.items():
+        results["x_vals"] = x_vals
+        results[f"{tree_name}_mean"] = mean
+        results[f"{tree_name}_std"] = std
+        rows = []
+        for model, model_fit in fits[tree_name].items():
+            runs = seed_fits[tree_name][model]
+            intervals = seed_intervals(runs) if len(runs) > 1 else ((np.nan, np.nan), (np.nan, np.nan))
+            rows.append([*model_fit.params(), model_fit.r_squared(), *intervals[0], *intervals[1]])
+        results[f"{tree_name}_fit"] = np.array(rows)
+    np.savez_compressed(path, **results)
+
+
+# python runner.py [n] [seeds] [workload] [curves.npz]
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    seed_count = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    workload = sys.argv[3] if len(sys.argv) > 3 else "uniform"
+    output = sys.argv[4] if len(sys.argv) > 4 else None
+    start = time.perf_counter()
+    curves, fits, seed_fits = run_sweep(seeds=range(seed_count), n=n, step=max(1, n // 100), workload=workload)
+    # Высоты внутри прогона зависимы, поэтому 95% интервалы для a и b
+    # строятся по разбросу оценок между независимыми seed
+    if seed_count > 1:
+        print(f"95% интервалы - по разбросу оценок между {seed_count} независимыми seed")
+    for tree_name, tree_fits in fits.items():
+        print(f"{tree_name}:")
+        for model, model_fit in tree_fits.items():
+            line = f"    {model_fit.equation()}   R^2 = {model_fit.r_squared():.4f}"
+            if seed_count > 1:
+                (a_lo, a_hi), (b_lo, b_hi) = seed_intervals(seed_fits[tree_name][model])
+                line += f"   a в [{a_lo:.4g}, {a_hi:.4g}]   b в [{b_lo:.4g}, {b_hi:.4g}]"
+            print(line)
+    # Средняя высота и стандартное отклонение по seed на четвертях диапазона
+    for tree_name, (x_vals, mean, std) in curves.items():
+        points = sorted({len(x_vals) * quarter // 4 - 1 for quarter in range(1, 5)} - {-1})
+        print(f"{tree_name}: " + "   ".join(f"n={x_vals[i]}: {mean[i]:.2f} ± {std[i]:.2f}" for i in points))
+    if output:
+        save_sweep(output, curves, fits, seed_fits, workload)
+        print(f"Кривые и регрессии сохранены в {output}")
+    print(f"Время: {time.perf_counter() - start:.1f} с")
@@ -0,0 +1,27 @@
+import pytest
+
+from trees import BST, AVLTree, BPlusTree, PersistentAVLTree, RBTree, SkipList, SplayTree, Treap, instrumented
+
+
+# В дереве остаются исходные ключи, а сравнения вызывающего кода с ними
+# не попадают в счетчик
+@pytest.mark.parametrize("tree_class", [BST, AVLTree, RBTree, BPlusTree])
+def test_instrumented_tree_stores_raw_keys(tree_class):
+    tree = instrumented(tree_class)()
+    keys = [7, 3, 9, 3, 1, 8, 2, 6, 5, 4] * 3
+    for key in keys:
+        tree.insert(key)
+    assert tree.stats.inserts == len(keys)
+    assert tree.stats.comparisons > 0
+    comparisons = tree.stats.comparisons
+    stored = tree.in_order()
+    assert all(type(key) is int for key in stored)
+    assert stored == sorted(stored)
+    assert 5 in tree and tree.min() == 1
+    assert tree.stats.comparisons == comparisons
+
+
+@pytest.mark.parametrize("tree_class", [SplayTree, Treap, PersistentAVLTree, SkipList])
+def test_instrumented_rejects_unsupported_trees(tree_class):
+    with pytest.raises(TypeError, match="supported trees are BST"):
+        instrumented(tree_class)
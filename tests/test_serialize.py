@@ -0,0 +1,33 @@
+import pytest
+
+from trees import BST, AVLTree, RBTree
+
+
+@pytest.mark.parametrize("tree_class", [BST, AVLTree, RBTree])
+@pytest.mark.parametrize("keys", [[5, -3, 2 ** 63 - 1, -2 ** 63, 5], [2.5, -1.0, 0.125]])
+def test_round_trip_keeps_key_types(tree_class, keys, tmp_path):
+    tree = tree_class(multiset=True)
+    for key in keys:
+        tree.insert(key)
+    path = tmp_path / "tree.bin"
+    tree.save(path)
+    loaded = tree_class.load(path)
+    assert loaded.in_order() == tree.in_order()
+    assert [type(key) for key in loaded.in_order()] == [type(key) for key in tree.in_order()]
+    assert loaded.count(keys[0]) == tree.count(keys[0])
+
+
+# Неподдерживаемые ключи отвергаются до создания файла
+@pytest.mark.parametrize("keys, error, message", [
+    ([1, 2 ** 63], ValueError, "int64"),
+    (["a", "b"], TypeError, "supported key types are int"),
+    ([1, 2, 3.5], TypeError, "mix of int and float"),
+])
+def test_save_rejects_unsupported_keys(keys, error, message, tmp_path):
+    tree = RBTree()
+    for key in keys:
+        tree.insert(key)
+    path = tmp_path / "tree.bin"
+    with pytest.raises(error, match=message):
+        tree.save(path)
+    assert not path.exists()
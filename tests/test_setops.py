@@ -0,0 +1,123 @@
+import random
+from collections import Counter
+
+import pytest
+
+from trees import AVLTree, RBTree
+from trees.structure import structure_stats
+
+
+def make(tree_class, keys, multiset=False):
+    tree = tree_class(multiset)
+    for key in keys:
+        tree.insert(key)
+    return tree
+
+
+def as_set(keys):
+    return sorted(set(keys))
+
+
+def as_counter(tree):
+    return Counter({key: tree.count(key) for key in tree.in_order()})
+
+
+def assert_valid(tree):
+    stats = structure_stats(tree)
+    assert stats.height_mismatches == 0
+    if isinstance(tree, RBTree):
+        assert stats.rb_valid()
+    else:
+        assert set(stats.balance_factors) <= {-1, 0, 1}
+    if not tree.multiset:
+        assert len(tree) == stats.nodes
+
+
+# Повторяющиеся ключи первого дерева RB без multiset (отдельные узлы)
+def test_rb_difference_with_repeated_keys():
+    tree = make(RBTree, [5, 5, 5, 1, 9])
+    tree.difference(make(RBTree, [5, 9]))
+    assert tree.in_order() == [1]
+    assert_valid(tree)
+
+
+def test_rb_union_with_repeated_keys():
+    tree = make(RBTree, [5, 5, 5, 1, 9])
+    tree.union(make(RBTree, [5, 5, 9, 2]))
+    assert tree.in_order() == [1, 2, 5, 9]
+    assert_valid(tree)
+
+
+def test_rb_intersection_with_repeated_keys():
+    tree = make(RBTree, [5, 5, 5, 1, 9])
+    tree.intersection(make(RBTree, [5, 5, 2]))
+    assert tree.in_order() == [5]
+    assert_valid(tree)
+
+
+# Повторы, появившиеся через bulk_insert, join и split, тоже схлопываются
+def test_rb_repeated_keys_from_bulk_insert_and_join():
+    tree = RBTree.from_iterable([3, 3, 7])
+    other = make(RBTree, [8, 8])
+    tree.join(other)
+    tree.union(make(RBTree, [1]))
+    assert tree.in_order() == [1, 3, 7, 8]
+    less, count, greater = make(RBTree, [4, 2, 2, 6, 6]).split(5)
+    assert count == 0
+    less.union(greater)
+    assert less.in_order() == [2, 4, 6]
+
+
+def test_rb_repeated_keys_after_load(tmp_path):
+    path = tmp_path / "tree.bin"
+    make(RBTree, [2, 2, 4]).save(path)
+    tree = RBTree.load(path)
+    tree.union(make(RBTree, [3]))
+    assert tree.in_order() == [2, 3, 4]
+
+
+@pytest.mark.parametrize("tree_class", [AVLTree, RBTree])
+@pytest.mark.parametrize("operation", ["union", "intersection", "difference"])
+def test_set_operations_match_python_sets(tree_class, operation):
+    rng = random.Random(operation)
+    for _ in range(30):
+        first = [rng.randrange(60) for _ in range(rng.randrange(80))]
+        second = [rng.randrange(60) for _ in range(rng.randrange(80))]
+        tree = make(tree_class, first)
+        getattr(tree, operation)(make(tree_class, second))
+        expected = {
+            "union": set(first) | set(second),
+            "intersection": set(first) & set(second),
+            "difference": set(first) - set(second),
+        }[operation]
+        assert tree.in_order() == sorted(expected)
+        assert_valid(tree)
+
+
+@pytest.mark.parametrize("tree_class", [AVLTree, RBTree])
+@pytest.mark.parametrize("operation", ["union", "intersection", "difference"])
+def test_set_operations_match_counters(tree_class, operation):
+    rng = random.Random(operation)
+    for _ in range(30):
+        first = [rng.randrange(20) for _ in range(rng.randrange(60))]
+        second = [rng.randrange(20) for _ in range(rng.randrange(60))]
+        tree = make(tree_class, first, multiset=True)
+        getattr(tree, operation)(make(tree_class, second, multiset=True))
+        expected = {
+            "union": Counter(first) + Counter(second),
+            "intersection": Counter(first) & Counter(second),
+            "difference": Counter(first) - Counter(second),
+        }[operation]
+        assert as_counter(tree) == expected
+        assert_valid(tree)
+
+
+@pytest.mark.parametrize("tree_class", [AVLTree, RBTree])
+def test_parallel_union_matches_sequential(tree_class):
+    rng = random.Random(1)
+    first = rng.sample(range(5000), 2000)
+    second = rng.sample(range(5000), 2000)
+    tree = make(tree_class, first)
+    tree.union(make(tree_class, second), processes=2)
+    assert tree.in_order() == as_set(first + second)
+    assert_valid(tree)
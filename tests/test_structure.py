@@ -0,0 +1,51 @@
+import pytest
+
+from trees import BST, AVLTree, FastRBTree, PersistentAVLTree, RBTree, SplayTree, Treap
+from trees.skiplist import SkipList
+from trees.structure import structure_stats, write_dot
+
+
+# У списка с пропусками нет поля root - та же ошибка, что и для деревьев
+# без бинарных узлов, и для пустого, и для заполненного списка
+@pytest.mark.parametrize("keys", [[], [3, 1, 2]])
+def test_structure_stats_rejects_skip_list(keys, tmp_path):
+    skip_list = SkipList(seed=1)
+    for key in keys:
+        skip_list.insert(key)
+    with pytest.raises(TypeError, match="SkipList has no binary nodes"):
+        structure_stats(skip_list)
+    with pytest.raises(TypeError, match="SkipList has no binary nodes"):
+        write_dot(skip_list, tmp_path / "tree.dot")
+    assert not (tmp_path / "tree.dot").exists()
+
+
+def test_structure_stats_of_rb_tree():
+    tree = RBTree()
+    for key in range(100):
+        tree.insert(key)
+    stats = structure_stats(tree)
+    assert stats.nodes == 100
+    assert stats.height() == tree.height()
+    assert stats.rb_valid()
+
+
+# Метод дерева - тот же обход для любого дерева с бинарными узлами
+@pytest.mark.parametrize("tree_class", [BST, AVLTree, RBTree, FastRBTree, SplayTree, Treap])
+def test_structure_stats_method(tree_class):
+    tree = tree_class()
+    for key in [5, 2, 8, 1, 9, 3]:
+        tree.insert(key)
+    assert tree.structure_stats().nodes == 6
+    assert PersistentAVLTree.from_iterable(range(6)).structure_stats().nodes == 6
+
+
+# Кавычки и обратная косая черта в ключах-строках экранируются
+def test_write_dot_escapes_string_keys(tmp_path):
+    tree = BST()
+    for key in ['say "hi"', "back\\slash", "plain"]:
+        tree.insert(key)
+    path = tmp_path / "tree.dot"
+    tree.write_dot(path)
+    text = path.read_text(encoding="utf-8")
+    assert 'label="say \\"hi\\"\\n' in text
+    assert 'label="back\\\\slash\\n' in text
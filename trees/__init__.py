@@ -0,0 +1,48 @@
+# Деревья поиска: BST, AVL, красно-черное (и его быстрый вариант на узлах со
+# __slots__), B+, компактные варианты на массивах,
+# персистентные AVL/RB-деревья с историей версий, RCU-обёртка для
+# многопоточного чтения, а также splay-дерево, декартово дерево и список с
+# пропусками. Статистика формы дерева за один обход и экспорт в DOT - в
+# trees.structure.
+# Импорт пакета не тянет NumPy/SciPy/matplotlib: генераторы ключей лежат в
+# trees.workloads, регрессия - в fit.py, построение графиков - в main.py.
+from .avl import AVLNode, AVLTree
+from .bplus import BPlusTree
+from .bst import BST, Node
+from .compact import CompactAVLTree, CompactRBTree
+from .fastrb import FastRBNode, FastRBTree
+from .instrumentation import instrumented
+from .persistent import PersistentAVLTree, PersistentRBTree, VersionHistory
+from .rb import RBNode, RBTree
+from .rcu import RCUTree
+from .skiplist import SkipList
+from .splay import SplayNode, SplayTree
+from .structure import StructureStats, structure_stats, write_dot
+from .treap import Treap, TreapNode
+
+__all__ = [
+    "AVLNode",
+    "AVLTree",
+    "BPlusTree",
+    "BST",
+    "CompactAVLTree",
+    "CompactRBTree",
+    "FastRBNode",
+    "FastRBTree",
+    "Node",
+    "PersistentAVLTree",
+    "PersistentRBTree",
+    "RBNode",
+    "RBTree",
+    "RCUTree",
+    "SkipList",
+    "SplayNode",
+    "SplayTree",
+    "StructureStats",
+    "Treap",
+    "TreapNode",
+    "VersionHistory",
+    "instrumented",
+    "structure_stats",
+    "write_dot",
+]
@@ -0,0 +1,281 @@
+from collections import deque
+
+from . import structure
+
+# Ленивые обходы: генераторы держат в памяти только стек O(высоты)
+# (очередь O(ширины) для BFS) и позволяют остановиться на любом ключе.
+# nil - лист дерева: None для BST/AVL, сторожевой узел для RB.
+def _iter_in_order(node, nil=None):
+    stack = []
+    while stack or node is not nil:
+        while node is not nil:
+            stack.append(node)
+            node = node.left
+        node = stack.pop()
+        yield node.key
+        node = node.right
+
+# Пары (ключ, число вхождений) в порядке возрастания; в режиме multiset
+# число хранится в узле, иначе у каждого узла оно равно 1
+def _iter_counts(node, nil=None):
+    stack = []
+    while stack or node is not nil:
+        while node is not nil:
+            stack.append(node)
+            node = node.left
+        node = stack.pop()
+        yield node.key, node.count
+        node = node.right
+
+def _iter_pre_order(node, nil=None):
+    if node is nil:
+        return
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        yield node.key
+        if node.right is not nil:
+            stack.append(node.right)
+        if node.left is not nil:
+            stack.append(node.left)
+
+# Узел выдается, когда из его правого поддерева уже вернулись
+def _iter_post_order(node, nil=None):
+    stack = []
+    last = None
+    while stack or node is not nil:
+        if node is not nil:
+            stack.append(node)
+            node = node.left
+        else:
+            top = stack[-1]
+            if top.right is not nil and top.right is not last:
+                node = top.right
+            else:
+                yield top.key
+                last = stack.pop()
+
+def _iter_bfs(node, nil=None):
+    if node is nil:
+        return
+    queue = deque([node])
+    while queue:
+        node = queue.popleft()
+        yield node.key
+        if node.left is not nil:
+            queue.append(node.left)
+        if node.right is not nil:
+            queue.append(node.right)
+
+# Поиск и запросы по порядку, общие для всех деревьев. Равные ключи могут
+# лежать в обоих поддеревьях узла (вставка кладет их вправо, bulk_insert -
+# по обе стороны), поэтому спуск опирается только на left <= node <= right.
+def _find(node, key, nil=None):
+    while node is not nil:
+        if key == node.key:
+            return node
+        if key < node.key:
+            node = node.left
+        else:
+            node = node.right
+    return nil
+
+def _min_node(node, nil=None):
+    while node.left is not nil:
+        node = node.left
+    return node
+
+def _max_node(node, nil=None):
+    while node.right is not nil:
+        node = node.right
+    return node
+
+# Наименьший ключ, строго больший key
+def _successor(node, key, nil=None):
+    result = None
+    while node is not nil:
+        if node.key > key:
+            result = node.key
+            node = node.left
+        else:
+            node = node.right
+    return result
+
+# Ключи из [lo, hi] по возрастанию: поддеревья левее lo не посещаются,
+# обход прекращается на первом ключе больше hi - O(log n + k)
+def _iter_range(node, lo, hi, nil=None):
+    stack = []
+    while stack or node is not nil:
+        if node is not nil:
+            if node.key < lo:
+                node = node.right
+            else:
+                stack.append(node)
+                node = node.left
+        else:
+            node = stack.pop()
+            if node.key > hi:
+                return
+            yield node.key
+            node = node.right
+
+# Число вхождений key: в режиме multiset это счетчик единственного узла,
+# иначе - число равных узлов
+def _count(node, key, multiset, nil=None):
+    if multiset:
+        node = _find(node, key, nil)
+        return 0 if node is nil else node.count
+    return sum(1 for _ in _iter_range(node, key, key, nil))
+
+# Отсортированные пары (ключ, число) в списки различных ключей и их чисел:
+# соседние равные ключи складываются
+def _merge_counts(pairs):
+    keys = []
+    counts = []
+    for key, count in pairs:
+        if keys and key == keys[-1]:
+            counts[-1] += count
+        else:
+            keys.append(key)
+            counts.append(count)
+    return keys, counts
+
+# Порядковые статистики по размерам поддеревьев (AVL и RB): у nil размер 0
+def _size(node, nil=None):
+    if node is nil:
+        return 0
+    return node.size
+
+# k-й по возрастанию ключ, k с нуля
+def _select(node, k, nil=None):
+    while node is not nil:
+        left_size = _size(node.left, nil)
+        if k < left_size:
+            node = node.left
+        elif k == left_size:
+            return node.key
+        else:
+            k -= left_size + 1
+            node = node.right
+    raise IndexError("select index out of range")
+
+# Число ключей меньше key (не больше key при inclusive=True)
+def _rank(node, key, nil=None, inclusive=False):
+    result = 0
+    while node is not nil:
+        if node.key < key or (inclusive and node.key == key):
+            result += _size(node.left, nil) + 1
+            node = node.right
+        else:
+            node = node.left
+    return result
+
+# Запросы, обходы и статистика формы, общие для деревьев с узлами
+# key/left/right/count и полем root. Лист дерева - NIL: None (атрибут класса) у BST, AVL, splay- и
+# декартова деревьев и персистентных версий; у красно-черных деревьев -
+# сторожевой узел, который дерево заводит себе в __init__
+class _BinaryTree:
+    __slots__ = ()
+    NIL = None
+
+    def search(self, key):
+        return _find(self.root, key, self.NIL) is not self.NIL
+
+    def __contains__(self, key):
+        return self.search(key)
+
+    def min(self):
+        if self.root is self.NIL:
+            return None
+        return _min_node(self.root, self.NIL).key
+
+    def max(self):
+        if self.root is self.NIL:
+            return None
+        return _max_node(self.root, self.NIL).key
+
+    def successor(self, key):
+        return _successor(self.root, key, self.NIL)
+
+    # Ключи из отрезка [lo, hi] по возрастанию
+    def range(self, lo, hi):
+        return _iter_range(self.root, lo, hi, self.NIL)
+
+    # Число вхождений ключа
+    def count(self, key):
+        return _count(self.root, key, self.multiset, self.NIL)
+
+    # Симметричный обход (In-order)
+    def in_order(self):
+        return list(self.iter_in_order())
+
+    def iter_in_order(self):
+        return _iter_in_order(self.root, self.NIL)
+
+    # Прямой обход (Pre-order)
+    def pre_order(self):
+        return list(self.iter_pre_order())
+
+    def iter_pre_order(self):
+        return _iter_pre_order(self.root, self.NIL)
+
+    # Обратный обход (Post-order)
+    def post_order(self):
+        return list(self.iter_post_order())
+
+    def iter_post_order(self):
+        return _iter_post_order(self.root, self.NIL)
+
+    # Обход в ширину (BFS)
+    def bfs(self):
+        return list(self.iter_bfs())
+
+    def iter_bfs(self):
+        return _iter_bfs(self.root, self.NIL)
+
+    # Статистика формы дерева за один обход и граф в формате DOT (trees/structure.py)
+    def structure_stats(self):
+        return structure.structure_stats(self)
+
+    def write_dot(self, path):
+        return structure.write_dot(self, path)
+
+# Деревья с размерами поддеревьев в узлах (AVL, RB, персистентные):
+# длина и порядковые статистики за O(log n)
+class _SizedTree(_BinaryTree):
+    __slots__ = ()
+
+    def __len__(self):
+        return _size(self.root, self.NIL)
+
+    # k-й по возрастанию ключ (с нуля) за O(log n)
+    def select(self, k):
+        if k < 0:
+            k += len(self)
+        if k < 0:
+            raise IndexError("select index out of range")
+        return _select(self.root, k, self.NIL)
+
+    # Число ключей меньше key
+    def rank(self, key):
+        return _rank(self.root, key, self.NIL)
+
+    # Число ключей в отрезке [lo, hi]
+    def count_range(self, lo, hi):
+        if hi < lo:
+            return 0
+        return _rank(self.root, hi, self.NIL, inclusive=True) - _rank(self.root, lo, self.NIL)
+
+# Двоичный снимок дерева (BST, AVL, RB); serialize импортирует модули
+# деревьев, поэтому импорт здесь отложенный
+class _SerializableTree:
+    __slots__ = ()
+
+    def save(self, path):
+        from .serialize import save
+        save(self, path)
+
+    @classmethod
+    def load(cls, path):
+        from .serialize import load
+        return load(path, cls)
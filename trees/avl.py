@@ -0,0 +1,257 @@
+import heapq
+from operator import itemgetter
+
+from . import setops, snapshot
+from ._common import (
+    _find,
+    _min_node,
+    _iter_counts,
+    _merge_counts,
+    _size,
+    _SizedTree,
+    _SerializableTree,
+)
+from .setops import _AVLJoin
+
+# Узел AVL-дерева
+class AVLNode:
+    def __init__(self, key):
+        self.key = key
+        self.left = None
+        self.right = None
+        self.height = 1
+        self.size = 1
+        self.count = 1
+
+# Повторяющиеся ключи по умолчанию отбрасываются, при multiset=True
+# учитываются счетчиком count в узле, как в BST и RBTree; size, select и
+# rank считают различные ключи
+class AVLTree(_SizedTree, _SerializableTree):
+    def __init__(self, multiset=False):
+        self.root = None
+        self.multiset = multiset
+        self._snapshot = None
+
+    # Построение сбалансированного дерева из пачки ключей без поворотов
+    @classmethod
+    def from_iterable(cls, keys, multiset=False):
+        tree = cls(multiset)
+        tree.bulk_insert(keys)
+        return tree
+
+    # Пачка сливается с уже имеющимися ключами и дерево строится заново за
+    # O(n + m log m); sorted() на отсортированном входе работает за O(m).
+    # Для пачки, малой по сравнению с деревом, дешевле insert_batch.
+    def bulk_insert(self, keys):
+        self._snapshot = None
+        keys = sorted(keys)
+        if self.multiset:
+            pairs = ((key, 1) for key in keys)
+            if self.root:
+                pairs = heapq.merge(_iter_counts(self.root), pairs, key=itemgetter(0))
+            unique, counts = _merge_counts(pairs)
+            self.root = self._build(unique, 0, len(unique), counts)
+            return
+        if self.root:
+            keys = heapq.merge(self.iter_in_order(), keys)
+        unique = []
+        for key in keys:
+            if not unique or key != unique[-1]:
+                unique.append(key)
+        self.root = self._build(unique, 0, len(unique))
+
+    # Пачка ключей за O(m log m + m log(n/m + 1)): пачка сортируется и
+    # делится двоичным поиском по ключам узлов, части вливаются в поддеревья,
+    # а узлы склеиваются с результатами через join (setops.insert_sorted).
+    # Путь от корня к месту каждого ключа не проходится заново, высоты
+    # пересчитываются один раз в каждом затронутом узле. processes - как у
+    # union: пул для независимых поддеревьев окупается, когда пачка
+    # сравнима по размеру с деревом
+    def insert_batch(self, keys, processes=None):
+        self._snapshot = None
+        unique, counts = _merge_counts((key, 1) for key in sorted(keys))
+        if not self.multiset:
+            counts = [1] * len(unique)
+        self.root = setops.insert_sorted(_AVLJoin(AVLNode), self.root, unique, counts, self.multiset, processes)
+
+    # Середина отрезка - корень, половины - поддеревья; высота такого
+    # поддерева из hi - lo узлов равна (hi - lo).bit_length()
+    def _build(self, keys, lo, hi, counts=None):
+        if lo >= hi:
+            return None
+        mid = (lo + hi) // 2
+        node = AVLNode(keys[mid])
+        node.left = self._build(keys, lo, mid, counts)
+        node.right = self._build(keys, mid + 1, hi, counts)
+        node.height = (hi - lo).bit_length()
+        node.size = hi - lo
+        if counts is not None:
+            node.count = counts[mid]
+        return node
+
+    def insert(self, key):
+        self._snapshot = None
+        self.root = self._insert(self.root, key)
+
+    def _insert(self, current, key):
+        if not current:
+            return AVLNode(key)
+        if key < current.key:
+            current.left = self._insert(current.left, key)
+        elif key > current.key:
+            current.right = self._insert(current.right, key)
+        else:
+            if self.multiset:
+                current.count += 1
+            return current
+
+        self._update(current)
+        balance = self._get_balance(current)
+
+        if balance > 1 and key < current.left.key:
+            return self._rotate_right(current)
+        if balance < -1 and key > current.right.key:
+            return self._rotate_left(current)
+        if balance > 1 and key > current.left.key:
+            current.left = self._rotate_left(current.left)
+            return self._rotate_right(current)
+        if balance < -1 and key < current.right.key:
+            current.right = self._rotate_right(current.right)
+            return self._rotate_left(current)
+
+        return current
+
+    def _rotate_left(self, z):
+        y = z.right
+        T2 = y.left
+        y.left = z
+        z.right = T2
+        self._update(z)
+        self._update(y)
+        return y
+
+    def _rotate_right(self, z):
+        y = z.left
+        T3 = y.right
+        y.right = z
+        z.left = T3
+        self._update(z)
+        self._update(y)
+        return y
+
+    def _get_height(self, current):
+        if not current:
+            return 0
+        return current.height
+
+    # Высота и размер поддерева по детям
+    def _update(self, current):
+        current.height = 1 + max(self._get_height(current.left), self._get_height(current.right))
+        current.size = 1 + _size(current.left) + _size(current.right)
+
+    def _get_balance(self, current):
+        if not current:
+            return 0
+        return self._get_height(current.left) - self._get_height(current.right)
+
+    def height(self):
+        return self._get_height(self.root)
+
+    # Пакетный поиск массива ключей по отсортированному снимку дерева;
+    # снимок строится при первом вызове и сбрасывается любым изменением
+    def search_many(self, keys):
+        if self._snapshot is None:
+            self._snapshot = snapshot.freeze(self.in_order())
+        return snapshot.search_many(self._snapshot, keys)
+
+    def delete(self, key):
+        node = _find(self.root, key)
+        if node is None:
+            return False
+        if node.count > 1:
+            node.count -= 1
+            return True
+        self._snapshot = None
+        self.root = self._delete(self.root, key)
+        return True
+
+    def _delete(self, current, key):
+        if not current:
+            return current
+        if key < current.key:
+            current.left = self._delete(current.left, key)
+        elif key > current.key:
+            current.right = self._delete(current.right, key)
+        else:
+            if not current.left:
+                return current.right
+            if not current.right:
+                return current.left
+            successor = _min_node(current.right)
+            current.key = successor.key
+            current.count = successor.count
+            current.right = self._delete(current.right, successor.key)
+
+        self._update(current)
+        return self._rebalance(current)
+
+    # После удаления ключ уже не подсказывает вид поворота, смотрим на баланс детей
+    def _rebalance(self, current):
+        balance = self._get_balance(current)
+        if balance > 1:
+            if self._get_balance(current.left) < 0:
+                current.left = self._rotate_left(current.left)
+            return self._rotate_right(current)
+        if balance < -1:
+            if self._get_balance(current.right) > 0:
+                current.right = self._rotate_right(current.right)
+            return self._rotate_left(current)
+        return current
+
+    # Разрезание по key: два новых дерева с ключами меньше и больше key и
+    # число вхождений key. Узлы переходят в новые деревья, это дерево пустеет
+    def split(self, key):
+        self._snapshot = None
+        less, count, greater = setops.split(_AVLJoin(AVLNode), self.root, key)
+        self.root = None
+        return self._with_root(less), count, self._with_root(greater)
+
+    def _with_root(self, root):
+        tree = type(self)(self.multiset)
+        tree.root = root
+        return tree
+
+    # Присоединение справа дерева other, все ключи которого больше ключей
+    # этого дерева, за O(log n); other пустеет
+    def join(self, other):
+        self._check_compatible(other)
+        if self.root and other.root and not self.max() < other.min():
+            raise ValueError("every key of the joined tree must be greater")
+        self.root = setops.join(_AVLJoin(AVLNode), self.root, other.root)
+        other.root = None
+        self._snapshot = other._snapshot = None
+
+    # Объединение, пересечение и разность с other на месте за
+    # O(m log(n/m + 1)); узлы other переиспользуются, и оно пустеет.
+    # processes - число процессов пула для независимых половин (0 - по числу
+    # ядер), по умолчанию без пула
+    def union(self, other, processes=None):
+        self._set_operation(setops.UNION, other, processes)
+
+    def intersection(self, other, processes=None):
+        self._set_operation(setops.INTERSECTION, other, processes)
+
+    def difference(self, other, processes=None):
+        self._set_operation(setops.DIFFERENCE, other, processes)
+
+    def _set_operation(self, operation, other, processes):
+        self._check_compatible(other)
+        self.root = setops.set_operation(_AVLJoin(AVLNode), operation, self.root, other.root, self.multiset, processes)
+        other.root = None
+        self._snapshot = other._snapshot = None
+
+    def _check_compatible(self, other):
+        if not isinstance(other, AVLTree):
+            raise TypeError(f"cannot combine AVLTree with {type(other).__name__}")
+        if other.multiset != self.multiset:
+            raise ValueError("trees must both be in multiset mode or both not")
@@ -0,0 +1,173 @@
+from bisect import bisect_left, bisect_right, insort_right
+from collections import deque
+
+# B+-дерево: в узле - отсортированный список ключей, данные только в листьях,
+# листья связаны в список для последовательного чтения. Узел вмещает до fanout
+# ключей, поэтому высота ~ log_fanout(n), а поиск внутри узла идет через bisect
+# по непрерывному списку вместо перехода по указателю на каждом уровне.
+
+
+class _Leaf:
+    __slots__ = ("keys", "next")
+
+    def __init__(self, keys):
+        self.keys = keys
+        self.next = None
+
+
+class _Internal:
+    __slots__ = ("keys", "children")
+
+    def __init__(self, keys, children):
+        self.keys = keys
+        self.children = children
+
+
+class BPlusTree:
+    def __init__(self, fanout=64):
+        if fanout < 3:
+            raise ValueError("fanout must be at least 3")
+        self.fanout = fanout
+        self.root = _Leaf([])
+        # Самый левый лист не меняется: при расщеплении новый узел встает справа
+        self._head = self.root
+        self._height = 1
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    # Повторяющиеся ключи сохраняются и, как в BST, уходят вправо
+    def insert(self, key):
+        path = []
+        node = self.root
+        while type(node) is _Internal:
+            i = bisect_right(node.keys, key)
+            path.append((node, i))
+            node = node.children[i]
+
+        insort_right(node.keys, key)
+        self._size += 1
+        if len(node.keys) <= self.fanout:
+            return
+
+        # Расщепление листа: первый ключ правой половины становится разделителем
+        mid = len(node.keys) // 2
+        new_node = _Leaf(node.keys[mid:])
+        del node.keys[mid:]
+        new_node.next = node.next
+        node.next = new_node
+        separator = new_node.keys[0]
+
+        while path:
+            parent, i = path.pop()
+            parent.keys.insert(i, separator)
+            parent.children.insert(i + 1, new_node)
+            if len(parent.keys) <= self.fanout:
+                return
+            # Расщепление внутреннего узла: средний ключ поднимается выше
+            mid = len(parent.keys) // 2
+            separator = parent.keys[mid]
+            new_node = _Internal(parent.keys[mid + 1:], parent.children[mid + 1:])
+            del parent.keys[mid:]
+            del parent.children[mid + 1:]
+
+        self.root = _Internal([separator], [self.root, new_node])
+        self._height += 1
+
+    def height(self):
+        if not self._size:
+            return 0
+        return self._height
+
+    # Лист, с которого начинаются ключи >= key
+    def _find_leaf(self, key):
+        node = self.root
+        while type(node) is _Internal:
+            node = node.children[bisect_left(node.keys, key)]
+        return node
+
+    def search(self, key):
+        for _ in self.range(key, key):
+            return True
+        return False
+
+    def __contains__(self, key):
+        return self.search(key)
+
+    def min(self):
+        for key in self.iter_in_order():
+            return key
+        return None
+
+    def max(self):
+        node = self.root
+        while type(node) is _Internal:
+            node = node.children[-1]
+        return node.keys[-1] if node.keys else None
+
+    # Ключи из отрезка [lo, hi] по возрастанию: спуск к первому листу и
+    # дальше по цепочке листьев
+    def range(self, lo, hi):
+        leaf = self._find_leaf(lo)
+        i = bisect_left(leaf.keys, lo)
+        while leaf is not None:
+            keys = leaf.keys
+            while i < len(keys):
+                if keys[i] > hi:
+                    return
+                yield keys[i]
+                i += 1
+            leaf = leaf.next
+            i = 0
+
+    # Симметричный обход (In-order): все ключи по цепочке листьев
+    def in_order(self):
+        return list(self.iter_in_order())
+
+    def iter_in_order(self):
+        leaf = self._head
+        while leaf is not None:
+            yield from leaf.keys
+            leaf = leaf.next
+
+    # Прямой, обратный обход и BFS идут по узлам и выдают ключи каждого узла:
+    # у внутренних узлов это разделители, у листьев - сами данные
+
+    # Прямой обход (Pre-order)
+    def pre_order(self):
+        return list(self.iter_pre_order())
+
+    def iter_pre_order(self):
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            yield from node.keys
+            if type(node) is _Internal:
+                stack.extend(reversed(node.children))
+
+    # Обратный обход (Post-order)
+    def post_order(self):
+        return list(self.iter_post_order())
+
+    def iter_post_order(self):
+        stack = [(self.root, 0)]
+        while stack:
+            node, i = stack.pop()
+            if type(node) is _Internal and i < len(node.children):
+                stack.append((node, i + 1))
+                stack.append((node.children[i], 0))
+            else:
+                yield from node.keys
+
+    # Обход в ширину (BFS)
+    def bfs(self):
+        return list(self.iter_bfs())
+
+    def iter_bfs(self):
+        queue = deque([self.root])
+        while queue:
+            node = queue.popleft()
+            yield from node.keys
+            if type(node) is _Internal:
+                queue.extend(node.children)
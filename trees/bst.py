@@ -0,0 +1,102 @@
+from ._common import _BinaryTree, _SerializableTree
+
+# Узел бинарного дерева поиска
+class Node:
+    def __init__(self, key):
+        self.key = key
+        self.left = None
+        self.right = None
+        self.height = 1
+        self.count = 1
+
+# При multiset=True повторяющийся ключ не создает новый узел, а увеличивает
+# счетчик count в уже имеющемся; обходы и range выдают такой ключ один раз
+class BST(_BinaryTree, _SerializableTree):
+    def __init__(self, multiset=False):
+        self.root = None
+        self.multiset = multiset
+
+    def insert(self, key):
+        if not self.root:
+            self.root = Node(key)
+        else:
+            self._insert(self.root, key)
+
+    # Вставка без рекурсии: на вырожденном (отсортированном) входе дерево
+    # превращается в цепочку, и рекурсия упирается в лимит глубины
+    def _insert(self, current, key):
+        path = []
+        while current is not None:
+            if self.multiset and key == current.key:
+                current.count += 1
+                return
+            path.append(current)
+            if key < current.key:
+                current = current.left
+            else:
+                current = current.right
+
+        parent = path[-1]
+        if key < parent.key:
+            parent.left = Node(key)
+        else:
+            parent.right = Node(key)
+        self._update_heights(path)
+
+    # Высота поддерживается на пути вставки, как в AVLNode
+    def _update_heights(self, path):
+        for node in reversed(path):
+            new_height = 1 + max(self._get_height(node.left), self._get_height(node.right))
+            if new_height == node.height:
+                break
+            node.height = new_height
+
+    def _get_height(self, current):
+        if not current:
+            return 0
+        return current.height
+
+    def height(self):
+        return self._get_height(self.root)
+
+    # Удаление одного вхождения ключа без рекурсии; False, если ключа нет
+    def delete(self, key):
+        path = []
+        node = self.root
+        while node is not None and node.key != key:
+            path.append(node)
+            if key < node.key:
+                node = node.left
+            else:
+                node = node.right
+        if node is None:
+            return False
+        if node.count > 1:
+            node.count -= 1
+            return True
+
+        if node.left and node.right:
+            # Ключ заменяется преемником - минимумом правого поддерева
+            path.append(node)
+            parent = node
+            successor = node.right
+            while successor.left:
+                path.append(successor)
+                parent = successor
+                successor = successor.left
+            node.key = successor.key
+            node.count = successor.count
+            if parent is node:
+                parent.right = successor.right
+            else:
+                parent.left = successor.right
+        else:
+            child = node.left or node.right
+            if not path:
+                self.root = child
+            elif path[-1].left is node:
+                path[-1].left = child
+            else:
+                path[-1].right = child
+        self._update_heights(path)
+        return True
@@ -0,0 +1,296 @@
+from array import array
+from collections import deque
+
+# Компактное хранение узлов: вместо объекта на узел - столбцы типизированных
+# массивов (struct-of-arrays), узел задается целым индексом. Индекс 0 - пустая
+# ссылка (NIL): высота 0, черный цвет. Ключи - целые числа (int64).
+NIL = 0
+
+# В RB-дереве высота и цвет упакованы в один байт: старший бит - красный цвет,
+# младшие 7 бит - высота (высота RB-дерева не больше 2*log2(n + 1)).
+RED = 0x80
+HEIGHT = 0x7F
+
+
+class _CompactTree:
+    def __init__(self):
+        self.keys = array('q', [0])
+        self.left = array('i', [NIL])
+        self.right = array('i', [NIL])
+        self.root = NIL
+
+    def __len__(self):
+        return len(self.keys) - 1
+
+    # Симметричный обход (In-order)
+    def in_order(self):
+        return list(self.iter_in_order())
+
+    def iter_in_order(self):
+        keys, left, right = self.keys, self.left, self.right
+        stack = []
+        node = self.root
+        while stack or node:
+            while node:
+                stack.append(node)
+                node = left[node]
+            node = stack.pop()
+            yield keys[node]
+            node = right[node]
+
+    # Прямой обход (Pre-order)
+    def pre_order(self):
+        return list(self.iter_pre_order())
+
+    def iter_pre_order(self):
+        keys, left, right = self.keys, self.left, self.right
+        if not self.root:
+            return
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            yield keys[node]
+            if right[node]:
+                stack.append(right[node])
+            if left[node]:
+                stack.append(left[node])
+
+    # Обратный обход (Post-order)
+    def post_order(self):
+        return list(self.iter_post_order())
+
+    def iter_post_order(self):
+        keys, left, right = self.keys, self.left, self.right
+        stack = []
+        node = self.root
+        last = NIL
+        while stack or node:
+            if node:
+                stack.append(node)
+                node = left[node]
+            else:
+                top = stack[-1]
+                if right[top] and right[top] != last:
+                    node = right[top]
+                else:
+                    yield keys[top]
+                    last = stack.pop()
+
+    # Обход в ширину (BFS)
+    def bfs(self):
+        return list(self.iter_bfs())
+
+    def iter_bfs(self):
+        keys, left, right = self.keys, self.left, self.right
+        if not self.root:
+            return
+        queue = deque([self.root])
+        while queue:
+            node = queue.popleft()
+            yield keys[node]
+            if left[node]:
+                queue.append(left[node])
+            if right[node]:
+                queue.append(right[node])
+
+
+# AVL-дерево на массивах, повторяет AVLTree
+class CompactAVLTree(_CompactTree):
+    def __init__(self):
+        super().__init__()
+        self.heights = array('B', [0])
+
+    def _new_node(self, key):
+        self.keys.append(key)
+        self.left.append(NIL)
+        self.right.append(NIL)
+        self.heights.append(1)
+        return len(self.keys) - 1
+
+    def insert(self, key):
+        self.root = self._insert(self.root, key)
+
+    def _insert(self, current, key):
+        if not current:
+            return self._new_node(key)
+        left, right, heights = self.left, self.right, self.heights
+        current_key = self.keys[current]
+        if key < current_key:
+            left[current] = self._insert(left[current], key)
+        elif key > current_key:
+            right[current] = self._insert(right[current], key)
+        else:
+            return current
+
+        self._update_height(current)
+        balance = heights[left[current]] - heights[right[current]]
+
+        if balance > 1 and key < self.keys[left[current]]:
+            return self._rotate_right(current)
+        if balance < -1 and key > self.keys[right[current]]:
+            return self._rotate_left(current)
+        if balance > 1 and key > self.keys[left[current]]:
+            left[current] = self._rotate_left(left[current])
+            return self._rotate_right(current)
+        if balance < -1 and key < self.keys[right[current]]:
+            right[current] = self._rotate_right(right[current])
+            return self._rotate_left(current)
+
+        return current
+
+    def _update_height(self, node):
+        heights = self.heights
+        heights[node] = 1 + max(heights[self.left[node]], heights[self.right[node]])
+
+    def _rotate_left(self, z):
+        y = self.right[z]
+        self.right[z] = self.left[y]
+        self.left[y] = z
+        self._update_height(z)
+        self._update_height(y)
+        return y
+
+    def _rotate_right(self, z):
+        y = self.left[z]
+        self.left[z] = self.right[y]
+        self.right[y] = z
+        self._update_height(z)
+        self._update_height(y)
+        return y
+
+    def height(self):
+        return self.heights[self.root]
+
+
+# Красно-черное дерево на массивах, повторяет RBTree
+class CompactRBTree(_CompactTree):
+    def __init__(self):
+        super().__init__()
+        self.parent = array('i', [NIL])
+        self.meta = array('B', [0])
+
+    def insert(self, key):
+        keys, left, right = self.keys, self.left, self.right
+        y = NIL
+        x = self.root
+        while x:
+            y = x
+            if key < keys[x]:
+                x = left[x]
+            else:
+                x = right[x]
+
+        keys.append(key)
+        left.append(NIL)
+        right.append(NIL)
+        self.parent.append(y)
+        self.meta.append(RED | 1)
+        z = len(keys) - 1
+
+        if not y:
+            self.root = z
+        elif key < keys[y]:
+            left[y] = z
+        else:
+            right[y] = z
+
+        self._update_heights(y)
+        self._fix_insert(z)
+
+    # Пересчет высот от узла к корню; останавливается, как только высота не изменилась
+    def _update_heights(self, node):
+        left, right, parent, meta = self.left, self.right, self.parent, self.meta
+        while node:
+            new_height = 1 + max(meta[left[node]] & HEIGHT, meta[right[node]] & HEIGHT)
+            if new_height == meta[node] & HEIGHT:
+                break
+            meta[node] = (meta[node] & RED) | new_height
+            node = parent[node]
+
+    def _set_height(self, node):
+        meta = self.meta
+        new_height = 1 + max(meta[self.left[node]] & HEIGHT, meta[self.right[node]] & HEIGHT)
+        meta[node] = (meta[node] & RED) | new_height
+
+    def _fix_insert(self, z):
+        left, right, parent, meta = self.left, self.right, self.parent, self.meta
+        while z != self.root and meta[parent[z]] & RED:
+            p = parent[z]
+            g = parent[p]
+            if p == left[g]:
+                y = right[g]
+                if meta[y] & RED:
+                    meta[p] &= HEIGHT
+                    meta[y] &= HEIGHT
+                    meta[g] |= RED
+                    z = g
+                else:
+                    if z == right[p]:
+                        z = p
+                        self._rotate_left(z)
+                        p = parent[z]
+                        g = parent[p]
+                    meta[p] &= HEIGHT
+                    meta[g] |= RED
+                    self._rotate_right(g)
+            else:
+                y = left[g]
+                if meta[y] & RED:
+                    meta[p] &= HEIGHT
+                    meta[y] &= HEIGHT
+                    meta[g] |= RED
+                    z = g
+                else:
+                    if z == left[p]:
+                        z = p
+                        self._rotate_right(z)
+                        p = parent[z]
+                        g = parent[p]
+                    meta[p] &= HEIGHT
+                    meta[g] |= RED
+                    self._rotate_left(g)
+        meta[self.root] &= HEIGHT
+
+    def _rotate_left(self, x):
+        left, right, parent = self.left, self.right, self.parent
+        y = right[x]
+        right[x] = left[y]
+        if left[y]:
+            parent[left[y]] = x
+        parent[y] = parent[x]
+        if not parent[x]:
+            self.root = y
+        elif x == left[parent[x]]:
+            left[parent[x]] = y
+        else:
+            right[parent[x]] = y
+        left[y] = x
+        parent[x] = y
+        self._set_height(x)
+        self._set_height(y)
+        self._update_heights(parent[y])
+
+    def _rotate_right(self, x):
+        left, right, parent = self.left, self.right, self.parent
+        y = left[x]
+        left[x] = right[y]
+        if right[y]:
+            parent[right[y]] = x
+        parent[y] = parent[x]
+        if not parent[x]:
+            self.root = y
+        elif x == right[parent[x]]:
+            right[parent[x]] = y
+        else:
+            left[parent[x]] = y
+        right[y] = x
+        parent[x] = y
+        self._set_height(x)
+        self._set_height(y)
+        self._update_heights(parent[y])
+
+    def is_red(self, node):
+        return bool(self.meta[node] & RED)
+
+    def height(self):
+        return self.meta[self.root] & HEIGHT
@@ -0,0 +1,337 @@
+import heapq
+from operator import itemgetter
+
+from ._common import (
+    _find,
+    _min_node,
+    _iter_counts,
+    _merge_counts,
+    _SizedTree,
+)
+
+# Красно-черное дерево с тем же алгоритмом, что и RBTree (вставка и удаление
+# по CLRS, те же повороты в том же порядке), поэтому при одной и той же
+# последовательности операций форма, цвета, высоты и размеры совпадают с
+# RBTree узел в узел. Отличается представление:
+# - узлы с __slots__: без __dict__ на каждый узел, доступ к полям быстрее;
+# - цвет - булево red вместо строк "RED"/"BLACK": проверка цвета - это
+#   проверка истинности, а не сравнение строк;
+# - сторож сравнивается только по идентичности (is) и в горячих циклах
+#   держится в локальной переменной.
+# Сохранение в файл и операции на основе join остаются у RBTree: они
+# рассчитаны на строковые цвета.
+
+
+class FastRBNode:
+    __slots__ = ("key", "left", "right", "parent", "red", "height", "size", "count")
+
+    def __init__(self, key, red=True):
+        self.key = key
+        self.left = None
+        self.right = None
+        self.parent = None
+        self.red = red
+        self.height = 1
+        self.size = 1
+        self.count = 1
+
+    # Цвет в записи RBTree - для сравнения деревьев и отладки
+    @property
+    def color(self):
+        return "RED" if self.red else "BLACK"
+
+
+class FastRBTree(_SizedTree):
+    def __init__(self, multiset=False):
+        self.NIL = FastRBNode(None, red=False)
+        self.NIL.height = 0
+        self.NIL.size = 0
+        self.root = self.NIL
+        self.multiset = multiset
+
+    @classmethod
+    def from_iterable(cls, keys, multiset=False):
+        tree = cls(multiset)
+        tree.bulk_insert(keys)
+        return tree
+
+    # Как RBTree.bulk_insert: слияние с имеющимися ключами и построение из
+    # середин отрезков, последний уровень красный
+    def bulk_insert(self, keys):
+        keys = sorted(keys)
+        counts = None
+        if self.multiset:
+            pairs = ((key, 1) for key in keys)
+            if self.root is not self.NIL:
+                pairs = heapq.merge(_iter_counts(self.root, self.NIL), pairs, key=itemgetter(0))
+            keys, counts = _merge_counts(pairs)
+        elif self.root is not self.NIL:
+            keys = list(heapq.merge(self.iter_in_order(), keys))
+        red_depth = len(keys).bit_length()
+        if red_depth == 1:
+            red_depth = 0
+        self.root = self._build(keys, 0, len(keys), None, 1, red_depth, counts)
+
+    def _build(self, keys, lo, hi, parent, depth, red_depth, counts=None):
+        if lo >= hi:
+            return self.NIL
+        mid = (lo + hi) // 2
+        node = FastRBNode(keys[mid], depth == red_depth)
+        node.parent = parent
+        node.left = self._build(keys, lo, mid, node, depth + 1, red_depth, counts)
+        node.right = self._build(keys, mid + 1, hi, node, depth + 1, red_depth, counts)
+        node.height = (hi - lo).bit_length()
+        node.size = hi - lo
+        if counts is not None:
+            node.count = counts[mid]
+        return node
+
+    def insert(self, key):
+        nil = self.NIL
+        if self.multiset:
+            node = _find(self.root, key, nil)
+            if node is not nil:
+                node.count += 1
+                return
+
+        z = FastRBNode(key)
+        z.left = nil
+        z.right = nil
+        y = None
+        x = self.root
+        while x is not nil:
+            y = x
+            x.size += 1
+            if key < x.key:
+                x = x.left
+            else:
+                x = x.right
+
+        z.parent = y
+        if y is None:
+            self.root = z
+        elif key < y.key:
+            y.left = z
+        else:
+            y.right = z
+
+        # Высоты от родителя нового узла вверх, пока они меняются
+        node = y
+        while node is not None:
+            left = node.left.height
+            right = node.right.height
+            new_height = 1 + (left if left > right else right)
+            if new_height == node.height:
+                break
+            node.height = new_height
+            node = node.parent
+
+        self._fix_insert_colors(z)
+
+    # Балансировка после вставки - случаи RBTree._fix_insert в том же порядке
+    def _fix_insert_colors(self, z):
+        parent = z.parent
+        while parent is not None and parent.red:
+            grand = parent.parent
+            if parent is grand.left:
+                uncle = grand.right
+                if uncle.red:
+                    parent.red = False
+                    uncle.red = False
+                    grand.red = True
+                    z = grand
+                else:
+                    if z is parent.right:
+                        z = parent
+                        self._rotate_left(z)
+                        parent = z.parent
+                    parent.red = False
+                    grand.red = True
+                    self._rotate_right(grand)
+            else:
+                uncle = grand.left
+                if uncle.red:
+                    parent.red = False
+                    uncle.red = False
+                    grand.red = True
+                    z = grand
+                else:
+                    if z is parent.left:
+                        z = parent
+                        self._rotate_right(z)
+                        parent = z.parent
+                    parent.red = False
+                    grand.red = True
+                    self._rotate_left(grand)
+            parent = z.parent
+        self.root.red = False
+
+    def _rotate_left(self, x):
+        nil = self.NIL
+        y = x.right
+        x.right = y.left
+        if y.left is not nil:
+            y.left.parent = x
+        parent = x.parent
+        y.parent = parent
+        if parent is None:
+            self.root = y
+        elif x is parent.left:
+            parent.left = y
+        else:
+            parent.right = y
+        y.left = x
+        x.parent = y
+        self._after_rotation(x, y)
+
+    def _rotate_right(self, x):
+        nil = self.NIL
+        y = x.left
+        x.left = y.right
+        if y.right is not nil:
+            y.right.parent = x
+        parent = x.parent
+        y.parent = parent
+        if parent is None:
+            self.root = y
+        elif x is parent.right:
+            parent.right = y
+        else:
+            parent.left = y
+        y.right = x
+        x.parent = y
+        self._after_rotation(x, y)
+
+    # x опустился под y: размеры и высоты обоих по детям, выше - высоты
+    # до первого неизменившегося узла
+    def _after_rotation(self, x, y):
+        y.size = x.size
+        x.size = 1 + x.left.size + x.right.size
+        left = x.left.height
+        right = x.right.height
+        x.height = 1 + (left if left > right else right)
+        left = y.left.height
+        right = y.right.height
+        y.height = 1 + (left if left > right else right)
+        node = y.parent
+        while node is not None:
+            left = node.left.height
+            right = node.right.height
+            new_height = 1 + (left if left > right else right)
+            if new_height == node.height:
+                break
+            node.height = new_height
+            node = node.parent
+
+    def height(self):
+        return self.root.height
+
+    # Удаление по CLRS, как RBTree.delete
+    def delete(self, key):
+        nil = self.NIL
+        z = _find(self.root, key, nil)
+        if z is nil:
+            return False
+        if z.count > 1:
+            z.count -= 1
+            return True
+
+        y = z
+        y_original_red = y.red
+        if z.left is nil:
+            x = z.right
+            self._transplant(z, z.right)
+            x_parent = z.parent
+        elif z.right is nil:
+            x = z.left
+            self._transplant(z, z.left)
+            x_parent = z.parent
+        else:
+            y = _min_node(z.right, nil)
+            y_original_red = y.red
+            x = y.right
+            if y.parent is z:
+                x.parent = y
+                x_parent = y
+            else:
+                x_parent = y.parent
+                self._transplant(y, y.right)
+                y.right = z.right
+                y.right.parent = y
+            self._transplant(z, y)
+            y.left = z.left
+            y.left.parent = y
+            y.red = z.red
+            y.height = z.height
+
+        node = x_parent
+        while node is not None:
+            node.size = 1 + node.left.size + node.right.size
+            node = node.parent
+        node = x_parent
+        while node is not None:
+            new_height = 1 + max(node.left.height, node.right.height)
+            if new_height == node.height:
+                break
+            node.height = new_height
+            node = node.parent
+        if not y_original_red:
+            self._fix_delete_colors(x)
+        return True
+
+    def _transplant(self, u, v):
+        parent = u.parent
+        if parent is None:
+            self.root = v
+        elif u is parent.left:
+            parent.left = v
+        else:
+            parent.right = v
+        v.parent = parent
+
+    def _fix_delete_colors(self, x):
+        while x is not self.root and not x.red:
+            parent = x.parent
+            if x is parent.left:
+                w = parent.right
+                if w.red:
+                    w.red = False
+                    parent.red = True
+                    self._rotate_left(parent)
+                    w = parent.right
+                if not w.left.red and not w.right.red:
+                    w.red = True
+                    x = parent
+                else:
+                    if not w.right.red:
+                        w.left.red = False
+                        w.red = True
+                        self._rotate_right(w)
+                        w = parent.right
+                    w.red = parent.red
+                    parent.red = False
+                    w.right.red = False
+                    self._rotate_left(parent)
+                    x = self.root
+            else:
+                w = parent.left
+                if w.red:
+                    w.red = False
+                    parent.red = True
+                    self._rotate_right(parent)
+                    w = parent.left
+                if not w.right.red and not w.left.red:
+                    w.red = True
+                    x = parent
+                else:
+                    if not w.left.red:
+                        w.right.red = False
+                        w.red = True
+                        self._rotate_left(w)
+                        w = parent.left
+                    w.red = parent.red
+                    parent.red = False
+                    w.left.red = False
+                    self._rotate_right(parent)
+                    x = self.root
+        x.red = False
@@ -0,0 +1,190 @@
+from bisect import bisect_right
+from time import perf_counter_ns
+
+from .avl import AVLTree
+from .bplus import BPlusTree
+from .bst import BST
+from .rb import RBTree
+
+# Инструментирование деревьев: instrumented(RBTree)() - подкласс, который
+# считает повороты, перекраски и сравнения ключей и строит гистограмму
+# задержек insert. Сами BST/AVLTree/RBTree не меняются, так что без
+# инструментирования накладных расходов нет.
+
+
+# Гистограмма в духе HdrHistogram: значение округляется вниз до significant_bits
+# старших бит. Старший бит - один из них, поэтому относительная погрешность
+# корзины меньше 2^-(significant_bits - 1)
+class LatencyHistogram:
+    def __init__(self, significant_bits=5):
+        self.significant_bits = significant_bits
+        self.counts = {}
+        self.total = 0
+        self.sum = 0
+        self.max = 0
+
+    def record(self, value):
+        shift = max(0, value.bit_length() - self.significant_bits)
+        bucket = (value >> shift) << shift
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        self.total += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def mean(self):
+        return self.sum / self.total if self.total else 0.0
+
+    # Нижняя граница корзины, в которую попадает p-й перцентиль
+    def percentile(self, p):
+        if not self.total:
+            return 0
+        threshold = self.total * p / 100
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= threshold:
+                return bucket
+        return self.max
+
+    # (нижние границы корзин, числа попаданий) по возрастанию
+    def buckets(self):
+        bounds = sorted(self.counts)
+        return bounds, [self.counts[bound] for bound in bounds]
+
+
+class TreeStats:
+    def __init__(self):
+        self.inserts = 0
+        self.rotations = 0
+        self.recolors = 0
+        self.comparisons = 0
+        self.latency = LatencyHistogram()
+
+    def summary(self):
+        return (f"вставок {self.inserts}, поворотов {self.rotations}, перекрасок {self.recolors}, "
+                f"сравнений {self.comparisons}, задержка p50 {self.latency.percentile(50)} нс, "
+                f"p99 {self.latency.percentile(99)} нс, max {self.latency.max} нс")
+
+
+# Подкласс типа ключа, считающий каждое сравнение. В такой объект на время
+# insert оборачивается вставляемый ключ: каждое сравнение в дереве идет с
+# ним с одной или другой стороны (у подкласса отраженная операция
+# вызывается первой), поэтому учитываются все сравнения вставки, включая
+# проверки при балансировке. В дереве после вставки хранится исходный ключ.
+def _counting_key_type(base, stats):
+    def counted(name):
+        method = getattr(base, name)
+
+        def compare(self, other):
+            stats.comparisons += 1
+            return method(self, other)
+        return compare
+
+    namespace = {"__slots__": (), "__hash__": base.__hash__}
+    for name in ("__lt__", "__le__", "__gt__", "__ge__", "__eq__", "__ne__"):
+        namespace[name] = counted(name)
+    return type(f"Counting{base.__name__.capitalize()}", (base,), namespace)
+
+
+# Узел RB-дерева, у которого цвет - свойство, считающее фактические перекраски
+def _counting_node_type(node_class, stats):
+    def get_color(self):
+        return self.__dict__["color"]
+
+    def set_color(self, color):
+        if self.__dict__.get("color", color) != color:
+            stats.recolors += 1
+        self.__dict__["color"] = color
+
+    return type(f"Counting{node_class.__name__}", (node_class,), {"color": property(get_color, set_color)})
+
+
+class _InstrumentedMixin:
+    def __init__(self, *args, **kwargs):
+        self.stats = TreeStats()
+        self._key_types = {}
+        super().__init__(*args, **kwargs)
+
+    def _counting_key(self, key):
+        key_type = type(key)
+        if key_type not in self._key_types:
+            self._key_types[key_type] = _counting_key_type(key_type, self.stats)
+        return self._key_types[key_type](key)
+
+    def insert(self, key):
+        counting_key = self._counting_key(key)
+        start = perf_counter_ns()
+        super().insert(counting_key)
+        self.stats.latency.record(perf_counter_ns() - start)
+        self.stats.inserts += 1
+        _store_raw_key(self, counting_key, key)
+
+    def _rotate_left(self, *args):
+        self.stats.rotations += 1
+        return super()._rotate_left(*args)
+
+    def _rotate_right(self, *args):
+        self.stats.rotations += 1
+        return super()._rotate_right(*args)
+
+
+# Замена считающего ключа, оставшегося в дереве после вставки, исходным:
+# обходы и запросы возвращают обычные ключи, а сравнения, которые с ними
+# делает вызывающий код, не попадают в счетчики. Новый ключ лежит на пути
+# поиска этого ключа (среди равных - последним, как при вставке), поэтому
+# хватает одного спуска; считающий ключ находится по идентичности раньше,
+# чем с ним что-либо сравнивается
+def _store_raw_key(tree, counting_key, key):
+    if isinstance(tree, BPlusTree):
+        # Ключ мог подняться разделителем в один из узлов пути
+        node = tree.root
+        while True:
+            keys = node.keys
+            for i, stored in enumerate(keys):
+                if stored is counting_key:
+                    keys[i] = key
+                    break
+            if not hasattr(node, "children"):
+                return
+            node = node.children[bisect_right(keys, key)]
+    nil = tree.NIL
+    node = tree.root
+    while node is not nil:
+        if node.key is counting_key:
+            node.key = key
+            return
+        node = node.left if key < node.key else node.right
+
+
+# Для RB-дерева новый узел перед балансировкой получает считающий цвет класс
+class _RecolorCountingMixin:
+    def _insert(self, z):
+        node_type = self.__dict__.get("_node_type")
+        if node_type is None:
+            node_type = self._node_type = _counting_node_type(type(z), self.stats)
+        z.__class__ = node_type
+        super()._insert(z)
+
+
+# Счетчики верны только для деревьев, которые вставляют на месте, поворачивают
+# через _rotate_left/_rotate_right и хранят ключи в узлах или в B+-листьях.
+# У остальных результат был бы неверным молча: повороты splay- и декартова
+# дерева встроены в вставку (0 поворотов), персистентные деревья возвращают
+# новую версию, которую insert обертки теряет, у FastRBTree цвет - слот
+# red, а список с пропусками оставил бы себе считающие ключи
+SUPPORTED = (BST, AVLTree, RBTree, BPlusTree)
+
+_instrumented_classes = {}
+
+
+def instrumented(tree_class):
+    if not issubclass(tree_class, SUPPORTED):
+        names = ", ".join(supported.__name__ for supported in SUPPORTED)
+        raise TypeError(f"cannot instrument {tree_class.__name__}: supported trees are {names}")
+    if tree_class not in _instrumented_classes:
+        bases = (_InstrumentedMixin, tree_class)
+        if hasattr(tree_class, "_fix_insert"):
+            bases = (_RecolorCountingMixin,) + bases
+        _instrumented_classes[tree_class] = type(f"Instrumented{tree_class.__name__}", bases, {})
+    return _instrumented_classes[tree_class]
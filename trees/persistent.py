@@ -0,0 +1,329 @@
+from collections import deque
+
+from ._common import (
+    _find,
+    _min_node,
+    _SizedTree,
+)
+
+# Персистентные AVL- и RB-деревья: узлы не изменяются после создания, вставка
+# и удаление копируют только путь от корня (O(log n) новых узлов), а все
+# нетронутые поддеревья разделяются со старой версией. Любая версия остается
+# целой, поэтому ее можно читать из других потоков без блокировок.
+
+
+# Неизменяемый узел: высота и размер считаются по детям при создании
+class PNode:
+    __slots__ = ("key", "left", "right", "height", "size")
+
+    def __init__(self, key, left=None, right=None):
+        self.key = key
+        self.left = left
+        self.right = right
+        self.height = 1 + max(left.height if left else 0, right.height if right else 0)
+        self.size = 1 + (left.size if left else 0) + (right.size if right else 0)
+
+
+# Цвета - те же строки "RED"/"BLACK", что и в RBNode
+class PRBNode(PNode):
+    __slots__ = ("color",)
+
+    def __init__(self, key, color="RED", left=None, right=None):
+        self.key = key
+        self.color = color
+        self.left = left
+        self.right = right
+        self.height = 1 + max(left.height if left else 0, right.height if right else 0)
+        self.size = 1 + (left.size if left else 0) + (right.size if right else 0)
+
+
+def _get_height(node):
+    if not node:
+        return 0
+    return node.height
+
+
+# Новый узел с ключом key и детьми left/right с восстановлением AVL-баланса;
+# повороты тоже строят новые узлы вместо перестановки ссылок
+def _balance(key, left, right):
+    left_height = _get_height(left)
+    right_height = _get_height(right)
+    if left_height > right_height + 1:
+        if _get_height(left.left) >= _get_height(left.right):
+            return PNode(left.key, left.left, PNode(key, left.right, right))
+        pivot = left.right
+        return PNode(pivot.key, PNode(left.key, left.left, pivot.left), PNode(key, pivot.right, right))
+    if right_height > left_height + 1:
+        if _get_height(right.right) >= _get_height(right.left):
+            return PNode(right.key, PNode(key, left, right.left), right.right)
+        pivot = right.left
+        return PNode(pivot.key, PNode(key, left, pivot.left), PNode(right.key, pivot.right, right.right))
+    return PNode(key, left, right)
+
+
+# Повторяющиеся ключи не добавляются, как в AVLTree; без изменений
+# возвращается тот же самый узел
+def _avl_insert(node, key):
+    if not node:
+        return PNode(key)
+    if key < node.key:
+        left = _avl_insert(node.left, key)
+        if left is node.left:
+            return node
+        return _balance(node.key, left, node.right)
+    if key > node.key:
+        right = _avl_insert(node.right, key)
+        if right is node.right:
+            return node
+        return _balance(node.key, node.left, right)
+    return node
+
+
+def _avl_delete_min(node):
+    if not node.left:
+        return node.right
+    return _balance(node.key, _avl_delete_min(node.left), node.right)
+
+
+def _avl_delete(node, key):
+    if not node:
+        return node
+    if key < node.key:
+        left = _avl_delete(node.left, key)
+        if left is node.left:
+            return node
+        return _balance(node.key, left, node.right)
+    if key > node.key:
+        right = _avl_delete(node.right, key)
+        if right is node.right:
+            return node
+        return _balance(node.key, node.left, right)
+    if not node.left:
+        return node.right
+    if not node.right:
+        return node.left
+    successor = _min_node(node.right)
+    return _balance(successor.key, node.left, _avl_delete_min(node.right))
+
+
+def _build(keys, lo, hi):
+    if lo >= hi:
+        return None
+    mid = (lo + hi) // 2
+    return PNode(keys[mid], _build(keys, lo, mid), _build(keys, mid + 1, hi))
+
+
+def _is_red(node):
+    return node is not None and node.color == "RED"
+
+
+def _blacken(node):
+    if node.color == "BLACK":
+        return node
+    return PRBNode(node.key, "BLACK", node.left, node.right)
+
+
+def _redden(node):
+    return PRBNode(node.key, "RED", node.left, node.right)
+
+
+# Черный узел с ключом key и детьми left/right с устранением двух красных
+# подряд (балансировка Окасаки в варианте Карса: два красных ребенка
+# перекрашиваются)
+def _rb_balance(left, key, right):
+    if _is_red(left) and _is_red(right):
+        return PRBNode(key, "RED", _blacken(left), _blacken(right))
+    if _is_red(left):
+        if _is_red(left.left):
+            return PRBNode(left.key, "RED", _blacken(left.left), PRBNode(key, "BLACK", left.right, right))
+        if _is_red(left.right):
+            pivot = left.right
+            return PRBNode(pivot.key, "RED", PRBNode(left.key, "BLACK", left.left, pivot.left),
+                           PRBNode(key, "BLACK", pivot.right, right))
+    if _is_red(right):
+        if _is_red(right.right):
+            return PRBNode(right.key, "RED", PRBNode(key, "BLACK", left, right.left), _blacken(right.right))
+        if _is_red(right.left):
+            pivot = right.left
+            return PRBNode(pivot.key, "RED", PRBNode(key, "BLACK", left, pivot.left),
+                           PRBNode(right.key, "BLACK", pivot.right, right.right))
+    return PRBNode(key, "BLACK", left, right)
+
+
+# Повторяющиеся ключи уходят вправо, как в RBTree
+def _rb_insert(node, key):
+    if node is None:
+        return PRBNode(key)
+    if key < node.key:
+        left = _rb_insert(node.left, key)
+        if node.color == "RED":
+            return PRBNode(node.key, "RED", left, node.right)
+        return _rb_balance(left, node.key, node.right)
+    right = _rb_insert(node.right, key)
+    if node.color == "RED":
+        return PRBNode(node.key, "RED", node.left, right)
+    return _rb_balance(node.left, node.key, right)
+
+
+# Удаление по Карсу: у левого поддерева после удаления из черного узла черная
+# высота на единицу меньше, чем у правого; восстанавливаем ее
+def _balance_left(left, key, right):
+    if _is_red(left):
+        return PRBNode(key, "RED", _blacken(left), right)
+    if right.color == "BLACK":
+        return _rb_balance(left, key, _redden(right))
+    pivot = right.left
+    return PRBNode(pivot.key, "RED", PRBNode(key, "BLACK", left, pivot.left),
+                   _rb_balance(pivot.right, right.key, _redden(right.right)))
+
+
+def _balance_right(left, key, right):
+    if _is_red(right):
+        return PRBNode(key, "RED", left, _blacken(right))
+    if left.color == "BLACK":
+        return _rb_balance(_redden(left), key, right)
+    pivot = left.right
+    return PRBNode(pivot.key, "RED", _rb_balance(_redden(left.left), left.key, pivot.left),
+                   PRBNode(key, "BLACK", pivot.right, right))
+
+
+# Слияние детей удаляемого узла: все ключи left не больше ключей right
+def _fuse(left, right):
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.color == "RED" and right.color == "RED":
+        middle = _fuse(left.right, right.left)
+        if _is_red(middle):
+            return PRBNode(middle.key, "RED", PRBNode(left.key, "RED", left.left, middle.left),
+                           PRBNode(right.key, "RED", middle.right, right.right))
+        return PRBNode(left.key, "RED", left.left, PRBNode(right.key, "RED", middle, right.right))
+    if right.color == "RED":
+        return PRBNode(right.key, "RED", _fuse(left, right.left), right.right)
+    if left.color == "RED":
+        return PRBNode(left.key, "RED", left.left, _fuse(left.right, right))
+    middle = _fuse(left.right, right.left)
+    if _is_red(middle):
+        return PRBNode(middle.key, "RED", PRBNode(left.key, "BLACK", left.left, middle.left),
+                       PRBNode(right.key, "BLACK", middle.right, right.right))
+    return _balance_left(left.left, left.key, PRBNode(right.key, "BLACK", middle, right.right))
+
+
+def _rb_delete(node, key):
+    if node is None:
+        return None
+    if key < node.key:
+        if node.left is not None and node.left.color == "BLACK":
+            return _balance_left(_rb_delete(node.left, key), node.key, node.right)
+        return PRBNode(node.key, "RED", _rb_delete(node.left, key), node.right)
+    if key > node.key:
+        if node.right is not None and node.right.color == "BLACK":
+            return _balance_right(node.left, node.key, _rb_delete(node.right, key))
+        return PRBNode(node.key, "RED", node.left, _rb_delete(node.right, key))
+    return _fuse(node.left, node.right)
+
+
+# Как RBTree._build: последний уровень красный, остальные черные
+def _build_rb(keys, lo, hi, depth, red_depth):
+    if lo >= hi:
+        return None
+    mid = (lo + hi) // 2
+    return PRBNode(keys[mid], "RED" if depth == red_depth else "BLACK",
+                   _build_rb(keys, lo, mid, depth + 1, red_depth),
+                   _build_rb(keys, mid + 1, hi, depth + 1, red_depth))
+
+
+# Общие для обоих деревьев запросы (_SizedTree): только чтение, поэтому
+# годятся для любой версии. Режима multiset нет: count считает равные узлы
+class _PersistentTree(_SizedTree):
+    __slots__ = ("root",)
+    multiset = False
+
+    def __init__(self, root=None):
+        self.root = root
+
+    def height(self):
+        return _get_height(self.root)
+
+
+class PersistentAVLTree(_PersistentTree):
+    __slots__ = ()
+
+    @classmethod
+    def from_iterable(cls, keys):
+        unique = []
+        for key in sorted(keys):
+            if not unique or key != unique[-1]:
+                unique.append(key)
+        return cls(_build(unique, 0, len(unique)))
+
+    # Вставка и удаление возвращают новую версию, исходная не меняется
+    def insert(self, key):
+        root = _avl_insert(self.root, key)
+        return self if root is self.root else type(self)(root)
+
+    def delete(self, key):
+        root = _avl_delete(self.root, key)
+        return self if root is self.root else type(self)(root)
+
+
+class PersistentRBTree(_PersistentTree):
+    __slots__ = ()
+
+    @classmethod
+    def from_iterable(cls, keys):
+        keys = sorted(keys)
+        red_depth = len(keys).bit_length()
+        if red_depth == 1:
+            red_depth = 0
+        return cls(_build_rb(keys, 0, len(keys), 1, red_depth))
+
+    def insert(self, key):
+        return type(self)(_blacken(_rb_insert(self.root, key)))
+
+    # Отсутствующий ключ дает ту же версию, как и в PersistentAVLTree
+    def delete(self, key):
+        if _find(self.root, key) is None:
+            return self
+        root = _rb_delete(self.root, key)
+        return type(self)(root and _blacken(root))
+
+
+# Последние max_versions версий дерева по номерам; вытесненные версии
+# освобождаются сборщиком мусора, а их поддеревья, общие с оставшимися,
+# живут дальше. Хранение k версий стоит O(n + k log n) узлов вместо
+# O(k n) при копировании дерева на каждый снимок.
+class VersionHistory:
+    def __init__(self, tree, max_versions=None):
+        self._versions = deque([tree], maxlen=max_versions)
+        self._oldest = 0
+
+    def latest(self):
+        return self._versions[-1]
+
+    def version(self, number):
+        index = number - self._oldest
+        if number < 0 or not 0 <= index < len(self._versions):
+            raise IndexError(f"version {number} is not retained")
+        return self._versions[index]
+
+    # Номера сохраненных версий, от самой старой
+    def versions(self):
+        return range(self._oldest, self._oldest + len(self._versions))
+
+    def __len__(self):
+        return len(self._versions)
+
+    # Каждое изменение дает новую версию и возвращает ее номер
+    def insert(self, key):
+        return self._push(self.latest().insert(key))
+
+    def delete(self, key):
+        return self._push(self.latest().delete(key))
+
+    def _push(self, tree):
+        if len(self._versions) == self._versions.maxlen:
+            self._oldest += 1
+        self._versions.append(tree)
+        return self._oldest + len(self._versions) - 1
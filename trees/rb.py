@@ -0,0 +1,432 @@
+import heapq
+from operator import itemgetter, lt
+
+from . import setops, snapshot
+from ._common import (
+    _find,
+    _min_node,
+    _iter_counts,
+    _merge_counts,
+    _SizedTree,
+    _SerializableTree,
+)
+from .setops import _RBJoin
+
+# Объединение через join (setops) выигрывает у поштучной вставки меньшего
+# дерева в большее, только если они сравнимы по размеру: по bench_setops на
+# n = 2*10^5..10^6 граница - около трети (m = n/2 быстрее join, m = n/4 уже
+# вставками)
+UNION_JOIN_RATIO = 3
+
+# Узел красно-черного дерева
+class RBNode:
+    def __init__(self, key, color="RED"):
+        self.key = key
+        self.left = None
+        self.right = None
+        self.parent = None
+        self.color = color
+        self.height = 1
+        self.size = 1
+        self.count = 1
+        # Черная высота поддерева - рабочее поле setops. Верна только в
+        # узлах, через которые прошла последняя операция на основе join;
+        # insert, delete и bulk_insert ее не обновляют, и после них она
+        # может быть устаревшей. setops пересчитывает ее вдоль левого края
+        # дерева (prepare) перед каждой операцией и передает детям при
+        # спуске, так что другой код читать это поле не должен
+        self.black_height = 1 if color == "BLACK" else 0
+
+# При multiset=True повторяющийся ключ увеличивает count в имеющемся узле,
+# как в BST и AVLTree
+class RBTree(_SizedTree, _SerializableTree):
+    def __init__(self, multiset=False):
+        self.NIL = RBNode(key=None, color="BLACK")
+        self.NIL.height = 0
+        self.NIL.size = 0
+        self.NIL.black_height = 0
+        self.root = self.NIL
+        self.multiset = multiset
+        self._snapshot = None
+        # Нет ли в дереве повторяющихся ключей (без multiset они - отдельные
+        # узлы); False - "возможно, есть", проверяется перед операциями над
+        # множествами
+        self._distinct = True
+
+    @classmethod
+    def from_iterable(cls, keys, multiset=False):
+        tree = cls(multiset)
+        tree.bulk_insert(keys)
+        return tree
+
+    # Как AVLTree.bulk_insert; повторяющиеся ключи сохраняются, как и в insert
+    def bulk_insert(self, keys):
+        self._snapshot = None
+        keys = sorted(keys)
+        counts = None
+        if self.multiset:
+            pairs = ((key, 1) for key in keys)
+            if self.root is not self.NIL:
+                pairs = heapq.merge(_iter_counts(self.root, self.NIL), pairs, key=itemgetter(0))
+            keys, counts = _merge_counts(pairs)
+        else:
+            if self.root is not self.NIL:
+                keys = list(heapq.merge(self.iter_in_order(), keys))
+            self._distinct = all(map(lt, keys, keys[1:]))
+        # Дерево из середин отрезков заполнено полностью, кроме последнего
+        # уровня: его узлы красные, остальные черные, так что черная высота
+        # одинакова на всех путях
+        red_depth = len(keys).bit_length()
+        if red_depth == 1:
+            red_depth = 0
+        self.root = self._build(keys, 0, len(keys), None, 1, red_depth, counts)
+
+    def _build(self, keys, lo, hi, parent, depth, red_depth, counts=None):
+        if lo >= hi:
+            return self.NIL
+        mid = (lo + hi) // 2
+        node = RBNode(keys[mid], "RED" if depth == red_depth else "BLACK")
+        node.parent = parent
+        node.left = self._build(keys, lo, mid, node, depth + 1, red_depth, counts)
+        node.right = self._build(keys, mid + 1, hi, node, depth + 1, red_depth, counts)
+        node.height = (hi - lo).bit_length()
+        node.size = hi - lo
+        if counts is not None:
+            node.count = counts[mid]
+        return node
+
+    def insert(self, key):
+        self._snapshot = None
+        # Размеры увеличиваются еще на спуске, поэтому имеющийся ключ
+        # ищется заранее
+        if self.multiset:
+            node = _find(self.root, key, self.NIL)
+            if node is not self.NIL:
+                node.count += 1
+                return
+        new_node = RBNode(key)
+        new_node.left = self.NIL
+        new_node.right = self.NIL
+        self._insert(new_node)
+
+    def _insert(self, z):
+        y = None
+        predecessor = None
+        x = self.root
+        while x is not self.NIL:
+            y = x
+            # Новый узел окажется в поддереве каждого узла на пути спуска
+            x.size += 1
+            if z.key < x.key:
+                x = x.left
+            else:
+                predecessor = x
+                x = x.right
+        # Предшественник нового узла - последний узел, где спуск ушел
+        # направо; если равный ключ в дереве есть, то это он
+        if predecessor is not None and not predecessor.key < z.key:
+            self._distinct = False
+
+        z.parent = y
+        if y is None:
+            self.root = z
+        elif z.key < y.key:
+            y.left = z
+        else:
+            y.right = z
+
+        z.color = "RED"
+        self._update_heights(y)
+        self._fix_insert(z)
+
+    # Пересчет высот от узла к корню; останавливается, как только высота не изменилась
+    def _update_heights(self, node):
+        while node is not None:
+            new_height = 1 + max(node.left.height, node.right.height)
+            if new_height == node.height:
+                break
+            node.height = new_height
+            node = node.parent
+
+    def _fix_insert(self, z):
+        while z is not self.root and z.parent.color == "RED":
+            if z.parent is z.parent.parent.left:
+                y = z.parent.parent.right
+                if y.color == "RED":
+                    z.parent.color = "BLACK"
+                    y.color = "BLACK"
+                    z.parent.parent.color = "RED"
+                    z = z.parent.parent
+                else:
+                    if z is z.parent.right:
+                        z = z.parent
+                        self._rotate_left(z)
+                    z.parent.color = "BLACK"
+                    z.parent.parent.color = "RED"
+                    self._rotate_right(z.parent.parent)
+            else:
+                y = z.parent.parent.left
+                if y.color == "RED":
+                    z.parent.color = "BLACK"
+                    y.color = "BLACK"
+                    z.parent.parent.color = "RED"
+                    z = z.parent.parent
+                else:
+                    if z is z.parent.left:
+                        z = z.parent
+                        self._rotate_right(z)
+                    z.parent.color = "BLACK"
+                    z.parent.parent.color = "RED"
+                    self._rotate_left(z.parent.parent)
+        self.root.color = "BLACK"
+
+    def _rotate_left(self, x):
+        y = x.right
+        x.right = y.left
+        if y.left is not self.NIL:
+            y.left.parent = x
+        y.parent = x.parent
+        if x.parent is None:
+            self.root = y
+        elif x is x.parent.left:
+            x.parent.left = y
+        else:
+            x.parent.right = y
+        y.left = x
+        x.parent = y
+        y.size = x.size
+        x.size = 1 + x.left.size + x.right.size
+        x.height = 1 + max(x.left.height, x.right.height)
+        y.height = 1 + max(y.left.height, y.right.height)
+        self._update_heights(y.parent)
+
+    def _rotate_right(self, x):
+        y = x.left
+        x.left = y.right
+        if y.right is not self.NIL:
+            y.right.parent = x
+        y.parent = x.parent
+        if x.parent is None:
+            self.root = y
+        elif x is x.parent.right:
+            x.parent.right = y
+        else:
+            x.parent.left = y
+        y.right = x
+        x.parent = y
+        y.size = x.size
+        x.size = 1 + x.left.size + x.right.size
+        x.height = 1 + max(x.left.height, x.right.height)
+        y.height = 1 + max(y.left.height, y.right.height)
+        self._update_heights(y.parent)
+
+    def height(self):
+        return self.root.height
+
+    # Пакетный поиск массива ключей по отсортированному снимку дерева;
+    # снимок строится при первом вызове и сбрасывается любым изменением
+    def search_many(self, keys):
+        if self._snapshot is None:
+            self._snapshot = snapshot.freeze(self.in_order())
+        return snapshot.search_many(self._snapshot, keys)
+
+    # Удаление по CLRS; высоты пересчитываются от места изъятия узла и в поворотах
+    def delete(self, key):
+        z = _find(self.root, key, self.NIL)
+        if z is self.NIL:
+            return False
+        if z.count > 1:
+            z.count -= 1
+            return True
+        self._snapshot = None
+
+        y = z
+        y_original_color = y.color
+        if z.left is self.NIL:
+            x = z.right
+            self._transplant(z, z.right)
+            x_parent = z.parent
+        elif z.right is self.NIL:
+            x = z.left
+            self._transplant(z, z.left)
+            x_parent = z.parent
+        else:
+            y = _min_node(z.right, self.NIL)
+            y_original_color = y.color
+            x = y.right
+            if y.parent is z:
+                x.parent = y
+                x_parent = y
+            else:
+                x_parent = y.parent
+                self._transplant(y, y.right)
+                y.right = z.right
+                y.right.parent = y
+            self._transplant(z, y)
+            y.left = z.left
+            y.left.parent = y
+            y.color = z.color
+            y.height = z.height
+
+        self._update_sizes(x_parent)
+        self._update_heights(x_parent)
+        if y_original_color == "BLACK":
+            self._fix_delete(x)
+        return True
+
+    # Размеры пересчитываются до корня: в отличие от высоты, меняются у всех предков
+    def _update_sizes(self, node):
+        while node is not None:
+            node.size = 1 + node.left.size + node.right.size
+            node = node.parent
+
+    def _transplant(self, u, v):
+        if u.parent is None:
+            self.root = v
+        elif u is u.parent.left:
+            u.parent.left = v
+        else:
+            u.parent.right = v
+        v.parent = u.parent
+
+    def _fix_delete(self, x):
+        while x is not self.root and x.color == "BLACK":
+            if x is x.parent.left:
+                w = x.parent.right
+                if w.color == "RED":
+                    w.color = "BLACK"
+                    x.parent.color = "RED"
+                    self._rotate_left(x.parent)
+                    w = x.parent.right
+                if w.left.color == "BLACK" and w.right.color == "BLACK":
+                    w.color = "RED"
+                    x = x.parent
+                else:
+                    if w.right.color == "BLACK":
+                        w.left.color = "BLACK"
+                        w.color = "RED"
+                        self._rotate_right(w)
+                        w = x.parent.right
+                    w.color = x.parent.color
+                    x.parent.color = "BLACK"
+                    w.right.color = "BLACK"
+                    self._rotate_left(x.parent)
+                    x = self.root
+            else:
+                w = x.parent.left
+                if w.color == "RED":
+                    w.color = "BLACK"
+                    x.parent.color = "RED"
+                    self._rotate_right(x.parent)
+                    w = x.parent.left
+                if w.right.color == "BLACK" and w.left.color == "BLACK":
+                    w.color = "RED"
+                    x = x.parent
+                else:
+                    if w.left.color == "BLACK":
+                        w.right.color = "BLACK"
+                        w.color = "RED"
+                        self._rotate_left(w)
+                        w = x.parent.left
+                    w.color = x.parent.color
+                    x.parent.color = "BLACK"
+                    w.left.color = "BLACK"
+                    self._rotate_right(x.parent)
+                    x = self.root
+        x.color = "BLACK"
+
+    # Разрезание по key, как AVLTree.split; новые деревья делят сторож с этим
+    def split(self, key):
+        self._snapshot = None
+        less, count, greater = setops.split(_RBJoin(self.NIL, RBNode), self.root, key)
+        self.root = self.NIL
+        return self._with_root(less), count, self._with_root(greater)
+
+    def _with_root(self, root):
+        tree = type(self)(self.multiset)
+        tree.NIL = self.NIL
+        tree.root = root
+        tree._distinct = self._distinct
+        return tree
+
+    # Присоединение справа дерева other с большими ключами, как AVLTree.join
+    def join(self, other):
+        self._share_nil(other)
+        if self.root is not self.NIL and other.root is not self.NIL and not self.max() < other.min():
+            raise ValueError("every key of the joined tree must be greater")
+        self.root = setops.join(_RBJoin(self.NIL, RBNode), self.root, other.root)
+        self._distinct = self._distinct and other._distinct
+        other.root = self.NIL
+        other._distinct = True
+        self._snapshot = other._snapshot = None
+
+    # Объединение, пересечение и разность на месте, как у AVLTree. Без
+    # multiset деревья - множества: повторяющиеся ключи сначала схлопываются
+    # в один узел (O(n) один раз, только если они могли появиться)
+    def union(self, other, processes=None):
+        self._set_operation(setops.UNION, other, processes)
+
+    def intersection(self, other, processes=None):
+        self._set_operation(setops.INTERSECTION, other, processes)
+
+    def difference(self, other, processes=None):
+        self._set_operation(setops.DIFFERENCE, other, processes)
+
+    def _set_operation(self, operation, other, processes):
+        self._share_nil(other)
+        if not self.multiset:
+            self._deduplicate()
+            other._deduplicate()
+        smaller, larger = (other, self) if len(other) <= len(self) else (self, other)
+        if operation == setops.UNION and len(smaller) * UNION_JOIN_RATIO < len(larger):
+            self.root = self._insert_all(larger, smaller)
+        else:
+            self.root = setops.set_operation(_RBJoin(self.NIL, RBNode), operation, self.root, other.root, self.multiset, processes)
+        other.root = self.NIL
+        other._distinct = True
+        self._snapshot = other._snapshot = None
+
+    # Объединение поштучной вставкой ключей меньшего дерева в большее:
+    # имеющийся ключ в режиме multiset получает счетчик, иначе пропускается
+    def _insert_all(self, larger, smaller):
+        nil = self.NIL
+        for key, count in _iter_counts(smaller.root, nil):
+            node = _find(larger.root, key, nil)
+            if node is nil:
+                node = RBNode(key)
+                node.left = nil
+                node.right = nil
+                node.count = count
+                larger._insert(node)
+            elif self.multiset:
+                node.count += count
+        return larger.root
+
+    # Перестроение без повторов, если они есть
+    def _deduplicate(self):
+        if self._distinct:
+            return
+        keys = self.in_order()
+        unique = [key for i, key in enumerate(keys) if i == 0 or keys[i - 1] < key]
+        if len(unique) < len(keys):
+            self._snapshot = None
+            red_depth = len(unique).bit_length()
+            if red_depth == 1:
+                red_depth = 0
+            self.root = self._build(unique, 0, len(unique), None, 1, red_depth)
+        self._distinct = True
+
+    # Узлы обоих деревьев должны ссылаться на один сторож: листья меньшего
+    # дерева перевешиваются на сторож большего за O(min(n, m))
+    def _share_nil(self, other):
+        if not isinstance(other, RBTree):
+            raise TypeError(f"cannot combine RBTree with {type(other).__name__}")
+        if other.multiset != self.multiset:
+            raise ValueError("trees must both be in multiset mode or both not")
+        if other.NIL is self.NIL:
+            return
+        smaller, larger = (other, self) if len(other) <= len(self) else (self, other)
+        setops.relink(smaller.root, smaller.NIL, larger.NIL)
+        if smaller.root is smaller.NIL:
+            smaller.root = larger.NIL
+        smaller.NIL = larger.NIL
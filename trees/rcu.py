@@ -0,0 +1,80 @@
+import threading
+
+from .persistent import PersistentAVLTree
+
+# Дерево для многопоточного сервиса в духе RCU: читатели берут текущую
+# неизменяемую версию одной операцией чтения атрибута и работают с ней без
+# блокировок, писатель под блокировкой строит новую версию копированием пути
+# и публикует ее одним присваиванием. Читатель никогда не видит дерево
+# посреди поворота, а запущенный обход до конца идет по своей версии.
+# Замена ссылки атомарна и в обычном, и в free-threaded CPython.
+
+
+class RCUTree:
+    def __init__(self, keys=(), persistent_class=PersistentAVLTree):
+        self._version = persistent_class.from_iterable(keys)
+        self._write_lock = threading.Lock()
+
+    # Неизменяемая версия для серии согласованных чтений
+    def snapshot(self):
+        return self._version
+
+    # Писатели выполняются по одному
+    def insert(self, key):
+        with self._write_lock:
+            self._version = self._version.insert(key)
+
+    def delete(self, key):
+        with self._write_lock:
+            version = self._version
+            self._version = version.delete(key)
+            return self._version is not version
+
+    # Чтения идут по версии, актуальной на момент вызова
+    def search(self, key):
+        return self._version.search(key)
+
+    def __contains__(self, key):
+        return self._version.search(key)
+
+    def __len__(self):
+        return len(self._version)
+
+    def height(self):
+        return self._version.height()
+
+    def min(self):
+        return self._version.min()
+
+    def max(self):
+        return self._version.max()
+
+    def successor(self, key):
+        return self._version.successor(key)
+
+    def range(self, lo, hi):
+        return self._version.range(lo, hi)
+
+    def in_order(self):
+        return self._version.in_order()
+
+    def iter_in_order(self):
+        return self._version.iter_in_order()
+
+    def pre_order(self):
+        return self._version.pre_order()
+
+    def iter_pre_order(self):
+        return self._version.iter_pre_order()
+
+    def post_order(self):
+        return self._version.post_order()
+
+    def iter_post_order(self):
+        return self._version.iter_post_order()
+
+    def bfs(self):
+        return self._version.bfs()
+
+    def iter_bfs(self):
+        return self._version.iter_bfs()
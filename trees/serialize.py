@@ -0,0 +1,230 @@
+import mmap
+import struct
+import sys
+from array import array
+
+from .avl import AVLNode, AVLTree
+from .bst import BST, Node
+from .rb import RBNode, RBTree
+
+# Двоичный снимок дерева: заголовок, ключи в прямом порядке (int64 или
+# float64, little-endian), затем битовые поля "есть левый ребенок" и "есть
+# правый ребенок" и для RB-дерева - поле цветов (1 - красный); у дерева в
+# режиме multiset в конце идут счетчики узлов (int64). Этого хватает, чтобы
+# восстановить ту же форму дерева за один линейный проход без вставок,
+# поворотов и перекрашиваний; высоты и размеры пересчитываются по детям.
+# Байт флагов раньше был нулевым выравниванием, поэтому старые файлы
+# читаются как обычные деревья.
+MAGIC = b"TREE"
+VERSION = 1
+HEADER = struct.Struct("<4sBBcBQ")
+KINDS = {BST: 0, AVLTree: 1, RBTree: 2}
+MULTISET = 1
+
+
+def _kind(tree_class):
+    for base, kind in KINDS.items():
+        if issubclass(tree_class, base):
+            return kind
+    raise TypeError(f"cannot serialize {tree_class.__name__}")
+
+
+def _set_bit(bits, i):
+    bits[i >> 3] |= 1 << (i & 7)
+
+
+def _get_bit(bits, i):
+    return bits[i >> 3] >> (i & 7) & 1
+
+
+# Ключи снимка - только int (int64) или только float: int не приводятся к
+# float молча, а остальные типы не записываются вовсе
+def _key_typecode(keys):
+    has_int = has_float = False
+    for key in keys:
+        if isinstance(key, float):
+            has_float = True
+        elif isinstance(key, int):
+            has_int = True
+        else:
+            raise TypeError(f"cannot save {type(key).__name__} key: supported key types are int (int64) and float")
+    if has_int and has_float:
+        raise TypeError("cannot save a mix of int and float keys: keys must be all int (int64) or all float")
+    return 'd' if has_float else 'q'
+
+
+def save(tree, path):
+    kind = _kind(type(tree))
+    nil = tree.NIL if kind == KINDS[RBTree] else None
+
+    # Прямой обход по узлам с явным стеком
+    nodes = []
+    stack = [tree.root] if tree.root is not nil else []
+    while stack:
+        node = stack.pop()
+        nodes.append(node)
+        if node.right is not nil:
+            stack.append(node.right)
+        if node.left is not nil:
+            stack.append(node.left)
+
+    n = len(nodes)
+    keys = [node.key for node in nodes]
+    typecode = _key_typecode(keys)
+    try:
+        keys = array(typecode, keys)
+    except OverflowError:
+        raise ValueError("int keys must fit in int64 to be saved") from None
+    if sys.byteorder != "little":
+        keys.byteswap()
+
+    has_left = bytearray((n + 7) // 8)
+    has_right = bytearray((n + 7) // 8)
+    colors = bytearray((n + 7) // 8)
+    for i, node in enumerate(nodes):
+        if node.left is not nil:
+            _set_bit(has_left, i)
+        if node.right is not nil:
+            _set_bit(has_right, i)
+        if nil is not None and node.color == "RED":
+            _set_bit(colors, i)
+
+    flags = MULTISET if tree.multiset else 0
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, kind, keys.typecode.encode(), flags, n))
+        f.write(keys.tobytes())
+        f.write(has_left)
+        f.write(has_right)
+        if nil is not None:
+            f.write(colors)
+        if flags & MULTISET:
+            counts = array('q', [node.count for node in nodes])
+            if sys.byteorder != "little":
+                counts.byteswap()
+            f.write(counts.tobytes())
+
+
+# Файл отображается в память: ключи и битовые поля читаются прямо из
+# страниц файла, без промежуточных копий
+def load(path, tree_class):
+    kind = _kind(tree_class)
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        magic, version, file_kind, typecode, flags, n = HEADER.unpack_from(mm)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a tree snapshot")
+        if file_kind != kind:
+            raise ValueError(f"{path} holds a different tree type than {tree_class.__name__}")
+
+        # Все срезы отображения нужно освободить до закрытия mmap
+        view = memoryview(mm)
+        views = [view]
+        try:
+            offset = HEADER.size
+            key_bytes = view[offset:offset + 8 * n]
+            views.append(key_bytes)
+            if sys.byteorder != "little":
+                keys = array(typecode.decode(), key_bytes.tobytes())
+                keys.byteswap()
+            else:
+                keys = key_bytes.cast(typecode.decode())
+                views.append(keys)
+            offset += 8 * n
+            bitset_size = (n + 7) // 8
+            has_left = view[offset:offset + bitset_size]
+            has_right = view[offset + bitset_size:offset + 2 * bitset_size]
+            colors = view[offset + 2 * bitset_size:offset + 3 * bitset_size]
+            views += [has_left, has_right, colors]
+
+            offset += (3 if kind == KINDS[RBTree] else 2) * bitset_size
+            counts = None
+            if flags & MULTISET:
+                count_bytes = view[offset:offset + 8 * n]
+                views.append(count_bytes)
+                counts = array('q', count_bytes.tobytes())
+                if sys.byteorder != "little":
+                    counts.byteswap()
+
+            tree = tree_class(multiset=bool(flags & MULTISET))
+            if kind == KINDS[RBTree]:
+                tree.root = _rebuild_rb(tree, n, keys, has_left, has_right, colors, counts)
+                # Повторы в снимке не отмечены: их наличие проверит первая
+                # операция над множествами
+                tree._distinct = tree.multiset
+            else:
+                node_class = AVLNode if kind == KINDS[AVLTree] else Node
+                tree.root = _rebuild(node_class, n, keys, has_left, has_right, counts)
+        finally:
+            for part in reversed(views):
+                part.release()
+    return tree
+
+
+# Следующий в прямом порядке узел - левый ребенок предыдущего, если тот его
+# имеет, иначе правый ребенок ближайшего узла, ждущего правого ребенка
+def _link(n, make_node, has_left, has_right, set_left, set_right):
+    nodes = []
+    pending_right = []
+    previous_has_left = False
+    for i in range(n):
+        node = make_node(i)
+        if nodes:
+            if previous_has_left:
+                set_left(nodes[-1], node)
+            else:
+                set_right(pending_right.pop(), node)
+        if _get_bit(has_right, i):
+            pending_right.append(node)
+        previous_has_left = _get_bit(has_left, i)
+        nodes.append(node)
+    return nodes
+
+
+def _rebuild(node_class, n, keys, has_left, has_right, counts=None):
+    def set_left(parent, child):
+        parent.left = child
+
+    def set_right(parent, child):
+        parent.right = child
+
+    def make_node(i):
+        node = node_class(keys[i])
+        if counts is not None:
+            node.count = counts[i]
+        return node
+
+    nodes = _link(n, make_node, has_left, has_right, set_left, set_right)
+    # В обратном прямом порядке дети обрабатываются раньше родителя
+    with_size = node_class is AVLNode
+    for node in reversed(nodes):
+        left_height = node.left.height if node.left else 0
+        right_height = node.right.height if node.right else 0
+        node.height = 1 + max(left_height, right_height)
+        if with_size:
+            node.size = 1 + (node.left.size if node.left else 0) + (node.right.size if node.right else 0)
+    return nodes[0] if nodes else None
+
+
+def _rebuild_rb(tree, n, keys, has_left, has_right, colors, counts=None):
+    nil = tree.NIL
+
+    def make_node(i):
+        node = RBNode(keys[i], "RED" if _get_bit(colors, i) else "BLACK")
+        node.left = nil
+        node.right = nil
+        if counts is not None:
+            node.count = counts[i]
+        return node
+
+    def set_left(parent, child):
+        parent.left = child
+        child.parent = parent
+
+    def set_right(parent, child):
+        parent.right = child
+        child.parent = parent
+
+    nodes = _link(n, make_node, has_left, has_right, set_left, set_right)
+    for node in reversed(nodes):
+        node.height = 1 + max(node.left.height, node.right.height)
+        node.size = 1 + node.left.size + node.right.size
+    return nodes[0] if nodes else nil
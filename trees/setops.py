@@ -0,0 +1,491 @@
+import os
+from bisect import bisect_left
+
+from ._common import _iter_counts
+
+# Операции над деревьями на основе join (Blelloch, Ferizovic, Sun, "Just Join
+# for Parallel Ordered Sets"): join(left, node, right) склеивает два дерева
+# через средний узел за O(|rank(left) - rank(right)|), а split, объединение,
+# пересечение и разность выражаются через него. Для деревьев размеров m <= n
+# теоретико-множественные операции стоят O(m log(n/m + 1)) вместо
+# O(m log(n + m)) при поштучной вставке.
+#
+# Узлы не копируются: операции переиспользуют узлы обоих деревьев, поэтому
+# исходные деревья после них разобраны. В режиме multiset счетчики ведут
+# себя как у Counter: объединение складывает их, пересечение берет минимум,
+# разность вычитает. Без multiset деревья рассматриваются как множества.
+
+UNION = "union"
+INTERSECTION = "intersection"
+DIFFERENCE = "difference"
+
+
+# Ранг AVL-поддерева - его высота, она уже хранится в узлах
+class _AVLJoin:
+    nil = None
+
+    def __init__(self, node_class):
+        self.node_class = node_class
+
+    # Новый экземпляр для процесса пула
+    def spawn(self):
+        return _AVLJoin(self.node_class)
+
+    # Подготовка корня входного дерева: высоты AVL-узлов всегда верны
+    def prepare(self, root):
+        pass
+
+    # Сбалансированное поддерево из отсортированных ключей и их счетчиков
+    def build(self, keys, counts):
+        return self._build(keys, counts, 0, len(keys))
+
+    def _build(self, keys, counts, lo, hi):
+        if lo >= hi:
+            return None
+        mid = (lo + hi) // 2
+        node = self.node_class(keys[mid])
+        node.count = counts[mid]
+        return self._make(node, self._build(keys, counts, lo, mid), self._build(keys, counts, mid + 1, hi))
+
+    def expose(self, node):
+        return node.left, node.right
+
+    def _make(self, node, left, right):
+        node.left = left
+        node.right = right
+        left_height = left.height if left else 0
+        right_height = right.height if right else 0
+        node.height = 1 + max(left_height, right_height)
+        node.size = 1 + (left.size if left else 0) + (right.size if right else 0)
+        return node
+
+    def join(self, left, node, right):
+        left_height = left.height if left else 0
+        right_height = right.height if right else 0
+        if left_height > right_height + 1:
+            return self._join_right(left, node, right)
+        if right_height > left_height + 1:
+            return self._join_left(left, node, right)
+        return self._make(node, left, right)
+
+    # Спуск по правому краю left до поддерева, сравнимого по высоте с right
+    def _join_right(self, left, node, right):
+        inner = left.right
+        outer_height = left.left.height if left.left else 0
+        if (inner.height if inner else 0) <= (right.height if right else 0) + 1:
+            tree = self._make(node, inner, right)
+            if tree.height <= outer_height + 1:
+                return self._make(left, left.left, tree)
+            return self._rotate_left(self._make(left, left.left, self._rotate_right(tree)))
+        tree = self._join_right(inner, node, right)
+        if tree.height <= outer_height + 1:
+            return self._make(left, left.left, tree)
+        return self._rotate_left(self._make(left, left.left, tree))
+
+    def _join_left(self, left, node, right):
+        inner = right.left
+        outer_height = right.right.height if right.right else 0
+        if (inner.height if inner else 0) <= (left.height if left else 0) + 1:
+            tree = self._make(node, left, inner)
+            if tree.height <= outer_height + 1:
+                return self._make(right, tree, right.right)
+            return self._rotate_right(self._make(right, self._rotate_left(tree), right.right))
+        tree = self._join_left(left, node, inner)
+        if tree.height <= outer_height + 1:
+            return self._make(right, tree, right.right)
+        return self._rotate_right(self._make(right, tree, right.right))
+
+    def _rotate_left(self, node):
+        pivot = node.right
+        return self._make(pivot, self._make(node, node.left, pivot.left), pivot.right)
+
+    def _rotate_right(self, node):
+        pivot = node.left
+        return self._make(pivot, pivot.left, self._make(node, pivot.right, node.right))
+
+    def finish(self, root):
+        return root
+
+
+# Ранг RB-поддерева - черная высота (черные узлы на пути до листа, включая
+# корень), она хранится в узле (RBNode.black_height). Вставка и удаление
+# RBTree ее не поддерживают, поэтому у корней входных деревьев она
+# пересчитывается по левому краю (prepare), детям передается при спуске
+# (expose), а склеенным узлам выставляется в _make.
+class _RBJoin:
+    def __init__(self, nil, node_class):
+        self.nil = nil
+        self.node_class = node_class
+
+    def spawn(self):
+        return _RBJoin(self.nil, self.node_class)
+
+    def prepare(self, root):
+        if root is self.nil:
+            return
+        rank = 0
+        node = root
+        while node is not self.nil:
+            rank += node.color == "BLACK"
+            node = node.left
+        root.black_height = rank
+
+    # Как RBTree._build: последний уровень красный, остальные черные
+    def build(self, keys, counts):
+        red_depth = len(keys).bit_length()
+        if red_depth == 1:
+            red_depth = 0
+        return self._build(keys, counts, 0, len(keys), 1, red_depth)
+
+    def _build(self, keys, counts, lo, hi, depth, red_depth):
+        if lo >= hi:
+            return self.nil
+        mid = (lo + hi) // 2
+        node = self.node_class(keys[mid])
+        node.count = counts[mid]
+        left = self._build(keys, counts, lo, mid, depth + 1, red_depth)
+        right = self._build(keys, counts, mid + 1, hi, depth + 1, red_depth)
+        return self._make(node, left, right, "RED" if depth == red_depth else "BLACK")
+
+    def expose(self, node):
+        nil = self.nil
+        rank = node.black_height - (node.color == "BLACK")
+        left = node.left
+        right = node.right
+        if left is not nil:
+            left.black_height = rank
+        if right is not nil:
+            right.black_height = rank
+        return left, right
+
+    def _make(self, node, left, right, color):
+        nil = self.nil
+        node.left = left
+        node.right = right
+        node.color = color
+        if left is not nil:
+            left.parent = node
+        if right is not nil:
+            right.parent = node
+        left_height = left.height
+        right_height = right.height
+        node.height = 1 + (left_height if left_height > right_height else right_height)
+        node.size = 1 + left.size + right.size
+        node.black_height = left.black_height + (color == "BLACK")
+        return node
+
+    # Перекраска красного узла без смены детей: их черная высота могла
+    # остаться от прошлых операций, поэтому считается от самого узла
+    def _blacken(self, node):
+        node.color = "BLACK"
+        node.black_height += 1
+
+    def join(self, left, node, right):
+        left_rank = left.black_height
+        right_rank = right.black_height
+        if left_rank > right_rank:
+            tree = self._join_right(left, node, right, right_rank)
+            if tree.color == "RED" and tree.right.color == "RED":
+                self._blacken(tree)
+            return tree
+        if right_rank > left_rank:
+            tree = self._join_left(left, node, right, left_rank)
+            if tree.color == "RED" and tree.left.color == "RED":
+                self._blacken(tree)
+            return tree
+        if left.color == "BLACK" and right.color == "BLACK":
+            return self._make(node, left, right, "RED")
+        return self._make(node, left, right, "BLACK")
+
+    # Спуск по правому краю left до черного узла с черной высотой right;
+    # два красных подряд на обратном пути снимаются поворотом
+    def _join_right(self, left, node, right, right_rank):
+        if left.color == "BLACK" and left.black_height == right_rank:
+            return self._make(node, left, right, "RED")
+        self.expose(left)
+        tree = self._join_right(left.right, node, right, right_rank)
+        if left.color == "BLACK" and tree.color == "RED" and tree.right.color == "RED":
+            self._blacken(tree.right)
+            self._make(left, left.left, tree.left, "BLACK")
+            return self._make(tree, left, tree.right, "RED")
+        return self._make(left, left.left, tree, left.color)
+
+    def _join_left(self, left, node, right, left_rank):
+        if right.color == "BLACK" and right.black_height == left_rank:
+            return self._make(node, left, right, "RED")
+        self.expose(right)
+        tree = self._join_left(left, node, right.left, left_rank)
+        if right.color == "BLACK" and tree.color == "RED" and tree.left.color == "RED":
+            self._blacken(tree.left)
+            self._make(right, tree.right, right.right, "BLACK")
+            return self._make(tree, tree.left, right, "RED")
+        return self._make(right, tree, right.right, right.color)
+
+    # Корень итогового дерева черный и без родителя
+    def finish(self, root):
+        if root is not self.nil:
+            root.parent = None
+            root.color = "BLACK"
+        return root
+
+
+# Разрезание по key: (ключи < key, узел с key или nil, ключи > key). Равные
+# ключи могут лежать по обе стороны узла, поэтому на равенстве режутся оба
+# поддерева, а счетчики всех равных узлов складываются в возвращаемый.
+def _split(ops, node, key):
+    nil = ops.nil
+    if node is nil:
+        return nil, nil, nil
+    left, right = ops.expose(node)
+    if key < node.key:
+        less, middle, greater = _split(ops, left, key)
+        return less, middle, ops.join(greater, node, right)
+    if node.key < key:
+        less, middle, greater = _split(ops, right, key)
+        return ops.join(left, node, less), middle, greater
+    less, left_equal, _ = _split(ops, left, key)
+    _, right_equal, greater = _split(ops, right, key)
+    for equal in (left_equal, right_equal):
+        if equal is not nil:
+            node.count += equal.count
+    return less, node, greater
+
+
+# Отрезание максимального узла
+def _split_last(ops, node):
+    left, right = ops.expose(node)
+    if right is ops.nil:
+        return left, node
+    rest, last = _split_last(ops, right)
+    return ops.join(left, node, rest), last
+
+
+# Склейка без среднего ключа: все ключи left меньше ключей right
+def _join2(ops, left, right):
+    if left is ops.nil:
+        return right
+    rest, last = _split_last(ops, left)
+    return ops.join(rest, last, right)
+
+
+# Шаг операции после рекурсии: left и right - результаты для половин, node -
+# корень первого дерева, equal - узел второго дерева с тем же ключом или nil
+def _combine(ops, operation, left, node, equal, right, multiset):
+    nil = ops.nil
+    if operation == UNION:
+        if multiset and equal is not nil:
+            node.count += equal.count
+        return ops.join(left, node, right)
+    if operation == INTERSECTION:
+        if equal is nil:
+            return _join2(ops, left, right)
+        if multiset:
+            node.count = min(node.count, equal.count)
+        return ops.join(left, node, right)
+    if equal is nil:
+        return ops.join(left, node, right)
+    if multiset and node.count > equal.count:
+        node.count -= equal.count
+        return ops.join(left, node, right)
+    return _join2(ops, left, right)
+
+
+# Результат, когда одно из деревьев пусто
+def _trivial(ops, operation, first, second):
+    if operation == UNION:
+        return second if first is ops.nil else first
+    if operation == INTERSECTION:
+        return ops.nil
+    return first
+
+
+def _set_operation(ops, operation, first, second, multiset):
+    nil = ops.nil
+    if first is nil or second is nil:
+        return _trivial(ops, operation, first, second)
+    left, right = ops.expose(first)
+    less, equal, greater = _split(ops, second, first.key)
+    left = _set_operation(ops, operation, left, less, multiset)
+    right = _set_operation(ops, operation, right, greater, multiset)
+    return _combine(ops, operation, left, first, equal, right, multiset)
+
+
+# Параллельный вариант: верхние уровни рекурсии выполняются здесь, а пары
+# независимых поддеревьев уходят в пул процессов. Поддеревья передаются не
+# графом узлов, а отсортированными списками ключей и счетчиков: pickle графа
+# в несколько раз дороже и потянул бы за ссылками parent все RB-дерево.
+# Процесс строит из списков сбалансированные поддеревья, выполняет ту же
+# операцию и возвращает результат тоже списками. Передача стоит O(n + m),
+# поэтому пул окупается на больших деревьях сравнимого размера.
+def _parallel_set_operation(ops, operation, first, second, multiset, processes):
+    from multiprocessing import Pool
+
+    processes = processes or os.cpu_count()
+    nil = ops.nil
+    tasks = []
+
+    # План рекурсии: лист плана - номер задачи, узел - (левая часть, корень,
+    # равный узел второго дерева, правая часть)
+    def divide(first, second, depth):
+        if depth == 0 or first is nil or second is nil:
+            tasks.append((ops.spawn(), operation, _flatten(first, nil), _flatten(second, nil), multiset))
+            return len(tasks) - 1
+        left, right = ops.expose(first)
+        less, equal, greater = _split(ops, second, first.key)
+        return (divide(left, less, depth - 1), first, equal, divide(right, greater, depth - 1))
+
+    if nil is not None:
+        nil.parent = None
+    plan = divide(first, second, (4 * processes - 1).bit_length())
+    with Pool(processes=processes) as pool:
+        results = [ops.build(keys, counts) for keys, counts in pool.map(_run_task, tasks)]
+
+    def conquer(plan):
+        if isinstance(plan, int):
+            return results[plan]
+        left, node, equal, right = plan
+        return _combine(ops, operation, conquer(left), node, equal, conquer(right), multiset)
+
+    return conquer(plan)
+
+
+# Вставка отсортированных различных ключей keys[lo:hi] со счетчиками в
+# дерево: пачка делится по ключу узла двоичным поиском, половины вливаются в
+# поддеревья, и узел склеивается с результатами через join. Посещаются
+# только узлы, под которыми есть ключи пачки, - O(m log(n/m + 1)), и в
+# отличие от объединения пачку не нужно разрезать как дерево. Ключ, равный
+# ключу узла, без multiset отбрасывается, как в объединении
+def _insert_sorted(ops, node, keys, counts, lo, hi, multiset):
+    if lo >= hi:
+        return node
+    if node is ops.nil:
+        return ops.build(keys[lo:hi], counts[lo:hi])
+    mid = bisect_left(keys, node.key, lo, hi)
+    end = mid
+    if end < hi and keys[end] == node.key:
+        if multiset:
+            node.count += counts[end]
+        end += 1
+    left, right = ops.expose(node)
+    if lo < mid:
+        left = _insert_sorted(ops, left, keys, counts, lo, mid, multiset)
+    if end < hi:
+        right = _insert_sorted(ops, right, keys, counts, end, hi, multiset)
+    return ops.join(left, node, right)
+
+
+# Параллельный вариант вставки пачки: верхние уровни дерева делят пачку
+# здесь, а поддеревья с их частями пачки уходят в пул списками, как в
+# _parallel_set_operation. Поддеревья без ключей пачки остаются на месте
+def _parallel_insert_sorted(ops, root, keys, counts, multiset, processes):
+    from multiprocessing import Pool
+
+    processes = processes or os.cpu_count()
+    nil = ops.nil
+    parts = []
+    tasks = []
+    owners = []
+
+    def divide(node, lo, hi, depth):
+        if lo >= hi or node is nil or depth == 0:
+            parts.append(node)
+            if lo < hi:
+                owners.append(len(parts) - 1)
+                tasks.append((ops.spawn(), _flatten(node, nil), keys[lo:hi], counts[lo:hi], multiset))
+            return len(parts) - 1
+        mid = bisect_left(keys, node.key, lo, hi)
+        end = mid
+        if end < hi and keys[end] == node.key:
+            if multiset:
+                node.count += counts[end]
+            end += 1
+        left, right = ops.expose(node)
+        return (divide(left, lo, mid, depth - 1), node, divide(right, end, hi, depth - 1))
+
+    if nil is not None:
+        nil.parent = None
+    plan = divide(root, 0, len(keys), (4 * processes - 1).bit_length())
+    with Pool(processes=processes) as pool:
+        for index, (part_keys, part_counts) in zip(owners, pool.map(_run_insert_task, tasks)):
+            parts[index] = ops.build(part_keys, part_counts)
+
+    def conquer(plan):
+        if isinstance(plan, int):
+            return parts[plan]
+        left, node, right = plan
+        return ops.join(conquer(left), node, conquer(right))
+
+    return conquer(plan)
+
+
+def _run_insert_task(task):
+    ops, (tree_keys, tree_counts), keys, counts, multiset = task
+    root = _insert_sorted(ops, ops.build(tree_keys, tree_counts), keys, counts, 0, len(keys), multiset)
+    return _flatten(root, ops.nil)
+
+
+def _run_task(task):
+    ops, operation, first, second, multiset = task
+    root = _set_operation(ops, operation, ops.build(*first), ops.build(*second), multiset)
+    return _flatten(root, ops.nil)
+
+
+def _flatten(root, nil):
+    keys = []
+    counts = []
+    for key, count in _iter_counts(root, nil):
+        keys.append(key)
+        counts.append(count)
+    return keys, counts
+
+
+# Перевешивание листьев RB-дерева с одного сторожа на другой
+def relink(root, old_nil, new_nil):
+    if old_nil is new_nil or root is old_nil:
+        return
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        if node.left is old_nil:
+            node.left = new_nil
+        else:
+            stack.append(node.left)
+        if node.right is old_nil:
+            node.right = new_nil
+        else:
+            stack.append(node.right)
+
+
+def split(ops, root, key):
+    ops.prepare(root)
+    less, middle, greater = _split(ops, root, key)
+    count = 0 if middle is ops.nil else middle.count
+    return ops.finish(less), count, ops.finish(greater)
+
+
+def join(ops, left, right):
+    ops.prepare(left)
+    ops.prepare(right)
+    return ops.finish(_join2(ops, left, right))
+
+
+# processes: None или 1 - без пула, 0 - по числу ядер
+def set_operation(ops, operation, first, second, multiset, processes=None):
+    ops.prepare(first)
+    ops.prepare(second)
+    if processes is None or processes == 1:
+        root = _set_operation(ops, operation, first, second, multiset)
+    else:
+        root = _parallel_set_operation(ops, operation, first, second, multiset, processes)
+    return ops.finish(root)
+
+
+# Вставка отсортированных различных ключей со счетчиками; processes - как у
+# set_operation
+def insert_sorted(ops, root, keys, counts, multiset, processes=None):
+    ops.prepare(root)
+    if processes is None or processes == 1:
+        root = _insert_sorted(ops, root, keys, counts, 0, len(keys), multiset)
+    else:
+        root = _parallel_insert_sorted(ops, root, keys, counts, multiset, processes)
+    return ops.finish(root)
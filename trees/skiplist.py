@@ -0,0 +1,186 @@
+import random
+
+# Список с пропусками (Пью): упорядоченный связный список, в котором узел с
+# вероятностью p получает ссылку и на следующем уровне. Поиск спускается с
+# верхнего уровня, проходя в среднем 1/p узлов на уровень, - ожидаемо
+# O(log n) без поворотов и перестроек. Высотой считается число уровней.
+#
+# Обходы идут по неявному дереву списка: башня - родитель следующих за ней
+# более низких башен вплоть до первой башни не ниже ее самой. Прямой обход
+# такого дерева совпадает с симметричным, а обход в ширину выдает уровни
+# сверху вниз, каждый ключ - на верхнем уровне своей башни.
+MAX_LEVEL = 32
+
+
+class _SkipNode:
+    __slots__ = ("key", "count", "forward")
+
+    def __init__(self, key, level):
+        self.key = key
+        self.count = 1
+        self.forward = [None] * level
+
+
+# Повторяющиеся ключи по умолчанию - отдельные узлы правее равных, как в
+# BST; при multiset=True учитываются счетчиком count в узле
+class SkipList:
+    def __init__(self, multiset=False, seed=None, p=0.5):
+        if not 0 < p < 1:
+            raise ValueError("p must be between 0 and 1")
+        self.multiset = multiset
+        self.p = p
+        self._head = _SkipNode(None, MAX_LEVEL)
+        self._level = 0
+        self._random = random.Random(seed)
+
+    def _random_level(self):
+        level = 1
+        while level < MAX_LEVEL and self._random.random() < self.p:
+            level += 1
+        return level
+
+    # Последний узел с ключом меньше key на каждом уровне (strict=False -
+    # не больше key), сверху вниз; элементы выше текущего уровня - голова
+    def _predecessors(self, key, strict=True):
+        update = [self._head] * MAX_LEVEL
+        node = self._head
+        for i in range(self._level - 1, -1, -1):
+            following = node.forward[i]
+            while following is not None and (following.key < key or not strict and following.key == key):
+                node = following
+                following = node.forward[i]
+            update[i] = node
+        return update
+
+    def insert(self, key):
+        update = self._predecessors(key, strict=self.multiset)
+        if self.multiset:
+            candidate = update[0].forward[0]
+            if candidate is not None and candidate.key == key:
+                candidate.count += 1
+                return
+
+        level = self._random_level()
+        if level > self._level:
+            self._level = level
+        node = _SkipNode(key, level)
+        for i in range(level):
+            node.forward[i] = update[i].forward[i]
+            update[i].forward[i] = node
+
+    def height(self):
+        return self._level
+
+    # Первый узел с ключом не меньше key
+    def _lower_bound(self, key):
+        node = self._head
+        for i in range(self._level - 1, -1, -1):
+            following = node.forward[i]
+            while following is not None and following.key < key:
+                node = following
+                following = node.forward[i]
+        return node.forward[0]
+
+    def search(self, key):
+        node = self._lower_bound(key)
+        return node is not None and node.key == key
+
+    def __contains__(self, key):
+        return self.search(key)
+
+    def min(self):
+        first = self._head.forward[0]
+        return first.key if first is not None else None
+
+    def max(self):
+        node = self._head
+        for i in range(self._level - 1, -1, -1):
+            while node.forward[i] is not None:
+                node = node.forward[i]
+        return node.key
+
+    # Наименьший ключ, строго больший key
+    def successor(self, key):
+        node = self._predecessors(key, strict=False)[0].forward[0]
+        return node.key if node is not None else None
+
+    # Ключи из отрезка [lo, hi] по возрастанию
+    def range(self, lo, hi):
+        node = self._lower_bound(lo)
+        while node is not None and node.key <= hi:
+            yield node.key
+            node = node.forward[0]
+
+    # Число вхождений ключа
+    def count(self, key):
+        node = self._lower_bound(key)
+        if self.multiset:
+            return node.count if node is not None and node.key == key else 0
+        result = 0
+        while node is not None and node.key == key:
+            result += 1
+            node = node.forward[0]
+        return result
+
+    # Удаление одного вхождения ключа; False, если ключа нет. Удаляется
+    # первый из равных узлов: на каждом его уровне предшественник ссылается
+    # именно на него
+    def delete(self, key):
+        update = self._predecessors(key)
+        node = update[0].forward[0]
+        if node is None or node.key != key:
+            return False
+        if node.count > 1:
+            node.count -= 1
+            return True
+        for i in range(len(node.forward)):
+            update[i].forward[i] = node.forward[i]
+        while self._level and self._head.forward[self._level - 1] is None:
+            self._level -= 1
+        return True
+
+    # Симметричный обход (In-order)
+    def in_order(self):
+        return list(self.iter_in_order())
+
+    def iter_in_order(self):
+        node = self._head.forward[0]
+        while node is not None:
+            yield node.key
+            node = node.forward[0]
+
+    # Прямой обход (Pre-order)
+    def pre_order(self):
+        return list(self.iter_pre_order())
+
+    def iter_pre_order(self):
+        return self.iter_in_order()
+
+    # Обратный обход (Post-order): башня выдается, когда встречена башня не
+    # ниже нее, то есть все ее потомки уже пройдены; стек - O(высоты)
+    def post_order(self):
+        return list(self.iter_post_order())
+
+    def iter_post_order(self):
+        stack = []
+        node = self._head.forward[0]
+        while node is not None:
+            level = len(node.forward)
+            while stack and len(stack[-1].forward) <= level:
+                yield stack.pop().key
+            stack.append(node)
+            node = node.forward[0]
+        while stack:
+            yield stack.pop().key
+
+    # Обход в ширину (BFS)
+    def bfs(self):
+        return list(self.iter_bfs())
+
+    def iter_bfs(self):
+        for i in range(self._level - 1, -1, -1):
+            node = self._head.forward[i]
+            while node is not None:
+                if len(node.forward) == i + 1:
+                    yield node.key
+                node = node.forward[i]
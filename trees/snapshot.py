@@ -0,0 +1,43 @@
+from collections import namedtuple
+
+# Пакетный поиск: ключи дерева замораживаются в отсортированный массив NumPy,
+# и все запросы обрабатываются двумя вызовами searchsorted. NumPy загружается
+# только при первом пакетном поиске, чтобы импорт trees оставался легким.
+
+# found - ключ есть в дереве; floor - наибольший ключ <= запроса, ceiling -
+# наименьший ключ >= запроса. Где has_floor/has_ceiling ложно, значение 0.
+SearchResult = namedtuple("SearchResult", "found floor has_floor ceiling has_ceiling")
+
+
+def freeze(sorted_keys):
+    import numpy as np
+
+    return np.array(sorted_keys)
+
+
+def search_many(snapshot, keys):
+    import numpy as np
+
+    probes = np.asarray(keys)
+    n = len(snapshot)
+    if not n:
+        empty = np.zeros(probes.shape, dtype=bool)
+        zeros = np.zeros(probes.shape, dtype=probes.dtype)
+        return SearchResult(empty, zeros, empty, zeros.copy(), empty.copy())
+
+    # Отсортированные запросы searchsorted обрабатывает заметно быстрее
+    # (меньше промахов кэша), поэтому запросы упорядочиваются и результат
+    # раскладывается обратно. Одного поиска левой границы достаточно:
+    # совпадение дает found и floor, соседний слева элемент - floor иначе
+    order = np.argsort(probes, axis=None, kind="stable")
+    left = np.empty(probes.size, dtype=np.intp)
+    left[order] = np.searchsorted(snapshot, probes.ravel()[order], side="left")
+    left = left.reshape(probes.shape)
+
+    has_ceiling = left < n
+    at = snapshot[np.minimum(left, n - 1)]
+    found = has_ceiling & (at == probes)
+    has_floor = found | (left > 0)
+    floor = np.where(found, at, np.where(left > 0, snapshot[np.maximum(left - 1, 0)], 0))
+    ceiling = np.where(has_ceiling, at, 0)
+    return SearchResult(found, floor, has_floor, ceiling, has_ceiling)
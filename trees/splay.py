@@ -0,0 +1,150 @@
+from ._common import _BinaryTree
+
+# Splay-дерево (Слейтор - Тарьян): найденный или вставленный узел поворотами
+# поднимается в корень, поэтому часто запрашиваемые ключи держатся у вершины
+# и повторный поиск горячего ключа стоит O(1) переходов. Амортизированная
+# стоимость операции - O(log n), но отдельная операция может пройти путь
+# длины O(n): после вставки отсортированных ключей дерево - цепочка.
+#
+# Подъем сверху вниз, за один проход: пройденные узлы собираются в левое и
+# правое деревья, которые в конце становятся поддеревьями нового корня. Это
+# вдвое быстрее подъема снизу по сохраненному пути, но высоты поддеревьев
+# при этом не поддерживаются - height() обходит дерево за O(n).
+
+
+class SplayNode:
+    __slots__ = ("key", "left", "right", "count")
+
+    def __init__(self, key):
+        self.key = key
+        self.left = None
+        self.right = None
+        self.count = 1
+
+
+# Подъем в корень поддерева node узла с ключом key, а если его нет - последнего
+# узла на пути поиска. header - служебный узел, в котором собираются левое
+# (header.right) и правое (header.left) деревья
+def _splay(node, key, header):
+    header.left = header.right = None
+    left = right = header
+    while True:
+        if key < node.key:
+            child = node.left
+            if child is None:
+                break
+            if key < child.key:
+                # zig-zig: поворот направо перед переносом в правое дерево
+                node.left = child.right
+                child.right = node
+                node = child
+                if node.left is None:
+                    break
+            right.left = node
+            right = node
+            node = node.left
+        elif key > node.key:
+            child = node.right
+            if child is None:
+                break
+            if key > child.key:
+                node.right = child.left
+                child.left = node
+                node = child
+                if node.right is None:
+                    break
+            left.right = node
+            left = node
+            node = node.right
+        else:
+            break
+    left.right = node.left
+    right.left = node.right
+    node.left = header.right
+    node.right = header.left
+    return node
+
+
+# Подъем максимума поддерева: тот же проход, что и поиск ключа больше всех
+def _splay_max(node, header):
+    header.right = None
+    left = header
+    while node.right is not None:
+        child = node.right
+        node.right = child.left
+        child.left = node
+        node = child
+        if node.right is None:
+            break
+        left.right = node
+        left = node
+        node = node.right
+    left.right = node.left
+    node.left = header.right
+    return node
+
+
+# Повторяющиеся ключи по умолчанию - отдельные узлы, как в BST; при
+# multiset=True учитываются счетчиком count в узле
+class SplayTree(_BinaryTree):
+    def __init__(self, multiset=False):
+        self.root = None
+        self.multiset = multiset
+        self._header = SplayNode(None)
+
+    # Корень после подъема key делит дерево: новый узел встает над ним
+    def insert(self, key):
+        if self.root is None:
+            self.root = SplayNode(key)
+            return
+        root = _splay(self.root, key, self._header)
+        if self.multiset and key == root.key:
+            root.count += 1
+            self.root = root
+            return
+        node = SplayNode(key)
+        if key < root.key:
+            node.left = root.left
+            node.right = root
+            root.left = None
+        else:
+            node.right = root.right
+            node.left = root
+            root.right = None
+        self.root = node
+
+    # Высота по уровням: очередь O(ширины)
+    def height(self):
+        height = 0
+        level = [self.root] if self.root is not None else []
+        while level:
+            height += 1
+            level = [child for node in level for child in (node.left, node.right) if child is not None]
+        return height
+
+    # Поиск поднимает в корень найденный узел, а при промахе - последний
+    # узел на пути, как и в классическом splay-дереве. Запросы по порядку
+    # (min, max, successor, range, count) дерево не перестраивают
+    def search(self, key):
+        if self.root is None:
+            return False
+        self.root = _splay(self.root, key, self._header)
+        return self.root.key == key
+
+    # Удаление одного вхождения ключа; False, если ключа нет. Узел поднимается
+    # в корень, после чего его поддеревья сливаются: максимум левого
+    # поднимается в его корень и получает правое поддерево справа
+    def delete(self, key):
+        if not self.search(key):
+            return False
+        root = self.root
+        if root.count > 1:
+            root.count -= 1
+            return True
+        if root.left is None:
+            self.root = root.right
+        else:
+            top = _splay_max(root.left, self._header)
+            top.right = root.right
+            self.root = top
+        return True
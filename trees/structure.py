@@ -0,0 +1,227 @@
+import json
+
+# Статистика формы дерева за один итеративный обход: число узлов, гистограмма
+# глубин, средняя и максимальная глубина листьев, распределение факторов
+# баланса (высота левого поддерева минус высота правого) и для красно-черных
+# деревьев - проверка черной высоты. Высоты поддеревьев считаются заново по
+# детям на выходе из узла, а не берутся из полей узлов, поэтому статистика
+# верна и для деревьев без хранимых высот (splay), а расхождения с хранимыми
+# высотами подсчитываются отдельно.
+#
+# Обход - явный стек кадров (узел, глубина): при входе в узел кадр кладется
+# обратно с отрицательной глубиной и снимается уже после обоих поддеревьев.
+# На стеке лежат только предки текущего узла и их отложенные правые дети, а
+# на стеке результатов - высоты готовых левых поддеревьев, так что время -
+# O(n), дополнительная память - O(высоты), без рекурсии и без списка узлов.
+# Глубина корня - 1, как и высота дерева из одного узла: максимальная
+# глубина листа равна height().
+#
+# Подходит для любого дерева с узлами left/right и полем root: BST, AVLTree,
+# RBTree, FastRBTree, версий персистентных деревьев, splay- и декартова
+# деревьев. Красно-черным считается дерево, у узлов которого есть color.
+
+
+class StructureStats:
+    def __init__(self):
+        self.nodes = 0
+        self.depth_histogram = []
+        self.leaves = 0
+        self.leaf_depth_sum = 0
+        self.max_leaf_depth = 0
+        self.balance_factors = {}
+        self.height_mismatches = 0
+        self.black_height = None
+        self.red_violations = 0
+        self.black_violations = 0
+        self.root_red = False
+
+    def height(self):
+        return len(self.depth_histogram)
+
+    def average_leaf_depth(self):
+        return self.leaf_depth_sum / self.leaves if self.leaves else 0.0
+
+    # Все красно-черные свойства: черный корень, у красного узла черные дети,
+    # у каждого узла одинаковая черная высота поддеревьев
+    def rb_valid(self):
+        if self.black_height is None:
+            return False
+        return not (self.root_red or self.red_violations or self.black_violations)
+
+    def as_dict(self):
+        return {
+            "nodes": self.nodes,
+            "height": self.height(),
+            "depth_histogram": list(self.depth_histogram),
+            "leaves": self.leaves,
+            "average_leaf_depth": self.average_leaf_depth(),
+            "max_leaf_depth": self.max_leaf_depth,
+            "balance_factors": {str(factor): count for factor, count in sorted(self.balance_factors.items())},
+            "height_mismatches": self.height_mismatches,
+            "black_height": self.black_height,
+            "rb_valid": self.rb_valid() if self.black_height is not None else None,
+        }
+
+    def to_json(self, indent=None):
+        return json.dumps(self.as_dict(), indent=indent)
+
+    # Массивы NumPy: глубины 1..height и число узлов на каждой, факторы
+    # баланса по возрастанию и число узлов с каждым. NumPy импортируется
+    # только здесь, чтобы import trees его не требовал
+    def to_numpy(self):
+        import numpy as np
+
+        factors = sorted(self.balance_factors)
+        return {
+            "depths": np.arange(1, self.height() + 1, dtype=np.int64),
+            "depth_counts": np.array(self.depth_histogram, dtype=np.int64),
+            "balance_factors": np.array(factors, dtype=np.int64),
+            "balance_counts": np.array([self.balance_factors[factor] for factor in factors], dtype=np.int64),
+        }
+
+    def summary(self):
+        factors = ", ".join(f"{factor:+d}: {count}" for factor, count in sorted(self.balance_factors.items()))
+        text = (f"узлов {self.nodes}, высота {self.height()}, листьев {self.leaves}, "
+                f"глубина листьев средняя {self.average_leaf_depth():.2f}, max {self.max_leaf_depth}, "
+                f"факторы баланса {{{factors}}}")
+        if self.height_mismatches:
+            text += f", неверных высот {self.height_mismatches}"
+        if self.black_height is not None:
+            text += f", черная высота {self.black_height}, RB-свойства {'верны' if self.rb_valid() else 'нарушены'}"
+        return text
+
+
+# Структуры без поля root (список с пропусками) не обходятся так же, как
+# деревья без бинарных узлов
+def _require_root(tree):
+    if not hasattr(tree, "root"):
+        raise TypeError(f"{type(tree).__name__} has no binary nodes")
+
+
+# Один обход дерева; visit(node, depth, balance, height), если задан,
+# вызывается для каждого узла после его поддеревьев
+def _walk(tree, visit=None):
+    _require_root(tree)
+    nil = getattr(tree, "NIL", None)
+    root = tree.root
+    stats = StructureStats()
+    if root is nil:
+        if hasattr(nil, "color"):
+            stats.black_height = 0
+        return stats
+    if not hasattr(root, "left"):
+        raise TypeError(f"{type(tree).__name__} has no binary nodes")
+    rb = hasattr(root, "color")
+    stored_heights = hasattr(root, "height")
+
+    depth_histogram = stats.depth_histogram
+    balance_factors = stats.balance_factors
+    nodes = leaves = leaf_depth_sum = max_leaf_depth = 0
+    height_mismatches = red_violations = black_violations = 0
+    heights = []
+    blacks = []
+    stack = [(root, 1)]
+    push = stack.append
+    pop = stack.pop
+    while stack:
+        node, depth = pop()
+        if depth > 0:
+            nodes += 1
+            # Ребенок глубже родителя на 1, а родитель уже учтен
+            if depth > len(depth_histogram):
+                depth_histogram.append(1)
+            else:
+                depth_histogram[depth - 1] += 1
+            push((node, -depth))
+            if node.right is not nil:
+                push((node.right, depth + 1))
+            if node.left is not nil:
+                push((node.left, depth + 1))
+            continue
+
+        depth = -depth
+        left = node.left
+        right = node.right
+        # Результаты правого поддерева лежат на стеке поверх левого
+        right_height = heights.pop() if right is not nil else 0
+        left_height = heights.pop() if left is not nil else 0
+        if left is nil and right is nil:
+            leaves += 1
+            leaf_depth_sum += depth
+            if depth > max_leaf_depth:
+                max_leaf_depth = depth
+        balance = left_height - right_height
+        balance_factors[balance] = balance_factors.get(balance, 0) + 1
+        height = 1 + (left_height if left_height > right_height else right_height)
+        if stored_heights and node.height != height:
+            height_mismatches += 1
+        heights.append(height)
+
+        if rb:
+            right_black = blacks.pop() if right is not nil else 0
+            left_black = blacks.pop() if left is not nil else 0
+            if left_black != right_black:
+                black_violations += 1
+            if node.color == "RED":
+                if (left is not nil and left.color == "RED") or (right is not nil and right.color == "RED"):
+                    red_violations += 1
+                blacks.append(max(left_black, right_black))
+            else:
+                blacks.append(max(left_black, right_black) + 1)
+
+        if visit is not None:
+            visit(node, depth, balance, height)
+
+    stats.nodes = nodes
+    stats.leaves = leaves
+    stats.leaf_depth_sum = leaf_depth_sum
+    stats.max_leaf_depth = max_leaf_depth
+    stats.height_mismatches = height_mismatches
+    if rb:
+        stats.black_height = blacks[0]
+        stats.red_violations = red_violations
+        stats.black_violations = black_violations
+        stats.root_red = root.color == "RED"
+    return stats
+
+
+def structure_stats(tree):
+    return _walk(tree)
+
+
+# Текст внутри строки DOT в кавычках: обратная косая черта и кавычка
+# экранируются, иначе ключ-строка с ними ломает файл
+def _dot_escape(text):
+    return text.replace("\\", "\\\\").replace('"', '\\"')
+
+
+# Граф дерева в формате DOT (Graphviz): метка узла - ключ, счетчик в режиме
+# multiset и фактор баланса, у красно-черного дерева узлы закрашены своим
+# цветом. Файл пишется по ходу того же обхода, что и статистика, которая
+# возвращается; в памяти не накапливается ничего сверх O(высоты)
+def write_dot(tree, path):
+    _require_root(tree)
+    nil = getattr(tree, "NIL", None)
+    with open(path, "w", encoding="utf-8") as out:
+        write = out.write
+
+        def visit(node, depth, balance, height):
+            count = getattr(node, "count", 1)
+            key = _dot_escape(str(node.key))
+            label = f"{key} x{count}" if count > 1 else key
+            attributes = f'label="{label}\\n{balance:+d}"'
+            color = getattr(node, "color", None)
+            if color == "RED":
+                attributes += ', style=filled, fillcolor="#d62728", fontcolor=white'
+            elif color == "BLACK":
+                attributes += ", style=filled, fillcolor=black, fontcolor=white"
+            write(f"  n{id(node)} [{attributes}];\n")
+            if node.left is not nil:
+                write(f'  n{id(node)} -> n{id(node.left)} [label="L"];\n')
+            if node.right is not nil:
+                write(f'  n{id(node)} -> n{id(node.right)} [label="R"];\n')
+
+        write(f"digraph {type(tree).__name__} {{\n  node [shape=circle];\n")
+        stats = _walk(tree, visit)
+        write("}\n")
+    return stats
@@ -0,0 +1,144 @@
+import random
+
+from ._common import _BinaryTree
+
+# Декартово дерево (treap): по ключам - дерево поиска, по случайным
+# приоритетам - куча с максимумом в корне. Форма дерева такая же, как у BST
+# со вставкой ключей в порядке убывания приоритетов, то есть в случайном
+# порядке, поэтому ожидаемая высота O(log n) на любом входе, в том числе на
+# отсортированном. Балансировка - только повороты на пути вставки/удаления.
+#
+# Приоритеты берутся из собственного генератора дерева: при заданном seed
+# форма дерева воспроизводима.
+
+
+class TreapNode:
+    __slots__ = ("key", "priority", "left", "right", "height", "count")
+
+    def __init__(self, key, priority):
+        self.key = key
+        self.priority = priority
+        self.left = None
+        self.right = None
+        self.height = 1
+        self.count = 1
+
+
+def _height(node):
+    return node.height if node is not None else 0
+
+
+def _update(node):
+    node.height = 1 + max(_height(node.left), _height(node.right))
+
+
+def _rotate_left(node):
+    top = node.right
+    node.right = top.left
+    top.left = node
+    _update(node)
+    _update(top)
+    return top
+
+
+def _rotate_right(node):
+    top = node.left
+    node.left = top.right
+    top.right = node
+    _update(node)
+    _update(top)
+    return top
+
+
+# Повторяющиеся ключи по умолчанию - отдельные узлы правее равного, как в
+# BST; при multiset=True учитываются счетчиком count в узле
+class Treap(_BinaryTree):
+    def __init__(self, multiset=False, seed=None):
+        self.root = None
+        self.multiset = multiset
+        self._random = random.Random(seed)
+
+    # Узел вставляется листом, затем поднимается поворотами, пока его
+    # приоритет больше приоритета родителя; выше точки остановки меняются
+    # только высоты
+    def insert(self, key):
+        path = []
+        node = self.root
+        while node is not None:
+            if self.multiset and key == node.key:
+                node.count += 1
+                return
+            path.append(node)
+            if key < node.key:
+                node = node.left
+            else:
+                node = node.right
+
+        node = TreapNode(key, self._random.random())
+        if not path:
+            self.root = node
+            return
+        if key < path[-1].key:
+            path[-1].left = node
+        else:
+            path[-1].right = node
+        while path and path[-1].priority < node.priority:
+            parent = path.pop()
+            if parent.left is node:
+                _rotate_right(parent)
+            else:
+                _rotate_left(parent)
+            self._replace(path, parent, node)
+        self._update_heights(path)
+
+    def _update_heights(self, path):
+        for node in reversed(path):
+            new_height = 1 + max(_height(node.left), _height(node.right))
+            if new_height == node.height:
+                break
+            node.height = new_height
+
+    def height(self):
+        return _height(self.root)
+
+    # Удаление одного вхождения ключа; False, если ключа нет. Узел опускается
+    # поворотами к ребенку с большим приоритетом, пока у него не останется
+    # не больше одного ребенка, и затем вырезается
+    def delete(self, key):
+        path = []
+        node = self.root
+        while node is not None and node.key != key:
+            path.append(node)
+            if key < node.key:
+                node = node.left
+            else:
+                node = node.right
+        if node is None:
+            return False
+        if node.count > 1:
+            node.count -= 1
+            return True
+
+        while node.left is not None and node.right is not None:
+            if node.left.priority > node.right.priority:
+                top = _rotate_right(node)
+            else:
+                top = _rotate_left(node)
+            self._replace(path, node, top)
+            path.append(top)
+
+        # Высоты узлов, поднятых поворотами, посчитаны еще с удаляемым узлом,
+        # поэтому путь пересчитывается целиком, без остановки
+        self._replace(path, node, node.left or node.right)
+        for node in reversed(path):
+            _update(node)
+        return True
+
+    # Замена ребенка последнего узла пути (или корня)
+    def _replace(self, path, old, new):
+        if not path:
+            self.root = new
+        elif path[-1].left is old:
+            path[-1].left = new
+        else:
+            path[-1].right = new
@@ -0,0 +1,74 @@
+import numpy as np
+
+# Генераторы ключей для экспериментов: вся последовательность строится
+# векторно из seed и возвращается массивом int64. Вставлять в деревья лучше
+# keys.tolist() - обычные int сравниваются быстрее скаляров NumPy.
+
+
+# Равномерные ключи из [1, n], как random.randint(1, n) в build_and_plot
+def uniform(rng, n):
+    return rng.integers(1, n + 1, size=n, dtype=np.int64)
+
+
+def sorted_keys(rng, n):
+    return np.sort(uniform(rng, n))
+
+
+def reverse_sorted(rng, n):
+    return sorted_keys(rng, n)[::-1].copy()
+
+
+# Отсортированные ключи, в которых переставлен 1% пар
+def nearly_sorted(rng, n, swap_fraction=0.01):
+    keys = sorted_keys(rng, n)
+    swaps = int(n * swap_fraction)
+    if n > 1 and swaps:
+        i = rng.integers(0, n, size=swaps)
+        j = rng.integers(0, n, size=swaps)
+        keys[i], keys[j] = keys[j], keys[i]
+    return keys
+
+
+# Распределение Ципфа, усеченное до рангов 1..n: ранг r выпадает с
+# вероятностью ~ 1 / r^a. Ранги больше n перевыбираются, а не обрезаются до
+# n - иначе весь хвост достается последнему рангу и самый холодный ключ
+# становится вторым горячим. Ранги отображаются на случайные ключи, чтобы
+# горячие ключи не были просто малыми
+def zipfian(rng, n, a=1.2):
+    ranks = rng.zipf(a, size=n)
+    over = ranks > n
+    while over.any():
+        ranks[over] = rng.zipf(a, size=int(over.sum()))
+        over = ranks > n
+    labels = rng.permutation(n).astype(np.int64) + 1
+    return labels[ranks - 1]
+
+
+# Плотные группы ключей вокруг случайных центров в широком диапазоне
+def clustered(rng, n, clusters=100, spread=50.0):
+    centers = rng.integers(1, 100 * n + 1, size=clusters, dtype=np.int64)
+    offsets = np.rint(rng.normal(0.0, spread, size=n)).astype(np.int64)
+    return centers[rng.integers(0, clusters, size=n)] + offsets
+
+
+# Малый словарь: каждый ключ повторяется в среднем 100 раз
+def duplicate_heavy(rng, n, distinct_ratio=0.01):
+    distinct = max(1, int(n * distinct_ratio))
+    return rng.integers(1, distinct + 1, size=n, dtype=np.int64)
+
+
+WORKLOADS = {
+    "uniform": uniform,
+    "sorted": sorted_keys,
+    "reverse_sorted": reverse_sorted,
+    "nearly_sorted": nearly_sorted,
+    "zipfian": zipfian,
+    "clustered": clustered,
+    "duplicate_heavy": duplicate_heavy,
+}
+
+
+def generate(name, n, seed=None):
+    if name not in WORKLOADS:
+        raise ValueError(f"unknown workload {name!r}, expected one of {', '.join(WORKLOADS)}")
+    return WORKLOADS[name](np.random.default_rng(seed), n)